@@ -174,12 +174,11 @@ class CalibrationMatcher:
             return {}
         result = {}
         try:
-            with self.context.database.bind_ctx([FitsHeader]):
-                for fh in FitsHeader.select().where(FitsHeader.file_id.in_(file_ids)):
-                    try:
-                        result[fh.file_id] = _session_info_from_header(decode_header_blob(fh.header))
-                    except Exception:
-                        pass
+            for fh in FitsHeader.select().where(FitsHeader.file_id.in_(file_ids)):
+                try:
+                    result[fh.file_id] = _session_info_from_header(decode_header_blob(fh.header))
+                except Exception:
+                    pass
         except Exception:
             pass
         return result
@@ -216,13 +215,12 @@ class CalibrationMatcher:
 
     def _query_files(self, criteria: SearchCriteria) -> list[File]:
         """Run a SearchCriteria query and return File rows with joined Image data."""
-        with self.context.database.bind_ctx([File, Image]):
-            query = (File
-                     .select(File, Image)
-                     .join(Image, JOIN.LEFT_OUTER)
-                     .order_by(File.root, File.path, File.name))
-            query = Image.apply_search_criteria(query, criteria)
-            return list(query)
+        query = (File
+                 .select(File, Image)
+                 .join(Image, JOIN.LEFT_OUTER)
+                 .order_by(File.root, File.path, File.name))
+        query = Image.apply_search_criteria(query, criteria)
+        return list(query)
 
     def find_candidates(self, criteria: SearchCriteria) -> list[CalibrationCandidate]:
         """Run a calibration search and group results by night into CalibrationCandidate list."""
@@ -1,17 +1,18 @@
 import logging
+import math
 import os
 import sys
 from abc import abstractmethod
 from enum import Enum
 from pathlib import Path
+from typing import Callable
 
-import astropy.units as u
 import zstd
 from PySide6.QtCore import QSettings, QObject, Signal
-from astropy.coordinates import SkyCoord
 from astropy.io.fits import Header
 from astropy_healpix import HEALPix
 from peewee import SqliteDatabase
+from playhouse.pool import PooledSqliteDatabase
 
 # Sky tessellation used for spatial indexing (cone searches). This is the single
 # source of truth for the HEALPix parameters used throughout the application.
@@ -19,6 +20,27 @@ HEALPIX_NSIDE = 256
 hp = HEALPix(nside=HEALPIX_NSIDE, order='nested', frame='icrs')
 
 
+def unit_vector(ra_deg: float, dec_deg: float) -> tuple[float, float, float]:
+    """Cartesian unit vector on the celestial sphere for an (ra, dec) position in degrees."""
+    ra, dec = math.radians(ra_deg), math.radians(dec_deg)
+    cos_dec = math.cos(dec)
+    return cos_dec * math.cos(ra), cos_dec * math.sin(ra), math.sin(dec)
+
+
+def angular_separation(ra1: float, dec1: float, ra2: float, dec2: float) -> float:
+    """Great-circle distance in degrees between two (ra, dec) positions in degrees.
+
+    Plain float math on unit vectors, so it is cheap enough to call per row (unlike building
+    a SkyCoord for each pair). atan2 of the cross and dot products stays accurate at both
+    small and large separations.
+    """
+    x1, y1, z1 = unit_vector(ra1, dec1)
+    x2, y2, z2 = unit_vector(ra2, dec2)
+    cross = math.hypot(y1 * z2 - z1 * y2, z1 * x2 - x1 * z2, x1 * y2 - y1 * x2)
+    dot = x1 * x2 + y1 * y2 + z1 * z2
+    return math.degrees(math.atan2(cross, dot))
+
+
 def get_default_astap_path():
     if Path("C:/Program Files/astap/astap.exe").exists():
         return "C:/Program Files/astap/astap.exe"
@@ -78,10 +100,9 @@ def register_udfs(db: SqliteDatabase):
 
     @db.func("sky_distance", 4)
     def db_sky_distance(ra1, dec1, ra2, dec2):
-        coord1 = SkyCoord(ra1, dec1, unit=u.deg, frame='icrs')
-        coord2 = SkyCoord(ra2, dec2, unit=u.deg, frame='icrs')
-        retval = coord1.separation(coord2).value
-        return retval
+        if None in (ra1, dec1, ra2, dec2):
+            return None
+        return angular_separation(ra1, dec1, ra2, dec2)
 
 
 class ApplicationContext:
@@ -105,6 +126,8 @@ class ApplicationContext:
         self.status_reporter: StatusReporter | None = None
         self.session_file = session_file
         self.signal_bus = SignalBus()
+        # files of the open database whose header could not be read, see check_missing_header_cache
+        self.unreadable_header_files: dict[int, tuple[int, int]] = {}
 
     def __enter__(self):
         self.open_database()
@@ -118,9 +141,15 @@ class ApplicationContext:
 
     def open_database(self) -> None:
         logging.info(f"Database path: {self.database_path}")
-        self.database = SqliteDatabase(self.database_path, pragmas={
+        # pooled: background workers check out their own connection (see BackgroundLoaderBase) and hand it back
+        # when done, so they read concurrently with the UI thread under WAL without reconnecting per task
+        self.database = PooledSqliteDatabase(self.database_path, max_connections=32, stale_timeout=300,
+                                             check_same_thread=False, pragmas={
             'journal_mode': 'wal',
+            'synchronous': 1,  # NORMAL: safe with WAL, no fsync per commit
+            'temp_store': 2,  # MEMORY
             'cache_size': -1 * 64000,  # 64MB
+            'mmap_size': 256 * 1024 * 1024,
             'foreign_keys': 1,
             'application_id': 0x46495453,  # FITS
         })
@@ -164,6 +193,15 @@ class ApplicationContext:
             )
         except Exception:
             pass
+        try:
+            # matches the "coord_ra IS NOT NULL" filter of the plate-solved image scans, skipping unsolved rows
+            self.database.execute_sql(
+                'CREATE INDEX IF NOT EXISTS idx_image_coords'
+                ' ON image(coord_ra, coord_dec)'
+                ' WHERE coord_ra IS NOT NULL'
+            )
+        except Exception:
+            pass
 
     def set_status_reporter(self, status_reporter: StatusReporter) -> None:
         self.status_reporter = status_reporter
@@ -182,11 +220,13 @@ class ApplicationContext:
             except Exception:
                 pass
             self.database.close()
+            self.database.close_all()
             logging.info(f"Database closed: {self.database_path}")
             self.database = None
 
     def switch_database(self, database_path: str | Path) -> None:
         self.close_database()
+        self.unreadable_header_files = {}
         self.database_path = database_path
         self.open_database()
 
@@ -266,6 +306,7 @@ class Settings:
         ("last_export_custom_headers", "last_export_custom_headers", "", str),
         ("last_export_use_master", "last_export_use_master", False, bool),
         ("last_export_shared_session", "last_export_shared_session", False, bool),
+        ("last_export_preserve_times", "last_export_preserve_times", True, bool),
         ("last_catalog", "last_catalog", "", str),
         ("bad_file_patterns", "bad_file_patterns", "bad*", str),
         ("bad_dir_patterns", "bad_dir_patterns", "bad*", str),
@@ -353,11 +394,16 @@ def _install_setting_accessors(cls) -> None:
 _install_setting_accessors(Settings)
 
 
-def backup_database(db: SqliteDatabase, backup_path: str | Path):
+def backup_database(db: SqliteDatabase, backup_path: str | Path, pages: int = -1,
+                    progress: Callable[[int, int, int], object] | None = None):
+    """Copy *db* to *backup_path* with SQLite's online backup, *pages* at a time (-1: all in one step).
+
+    *progress* is called after each step with (status, remaining, total) pages, as sqlite3 does.
+    """
     import sqlite3
+    target = sqlite3.connect(backup_path)
     try:
-        with sqlite3.connect(backup_path) as target:
-            db.connection().backup(target)
+        db.connection().backup(target, pages=pages, progress=progress)
     finally:
         target.close()
     logging.info(f"Database backup created at {backup_path}")
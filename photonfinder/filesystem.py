@@ -1,21 +1,30 @@
 import bz2
 import fnmatch
+import functools
 import gzip
+import io
 import json
 import logging
 import lzma
 import os
+import re
 import shutil
 import typing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
 from logging import log, INFO, DEBUG, ERROR, WARN
 from pathlib import Path
 
 import fs.path
-from astropy.io.fits import Header, Card
+import numpy as np
+from astropy.io.fits import Header, Card, PrimaryHDU
 from astropy.wcs.docstrings import naxis
 from fs.base import FS
 from fs.info import Info
-from peewee import JOIN
+from fs.osfs import OSFS
+from fs.time import epoch_to_datetime
+from peewee import JOIN, chunked
 from xisf import XISF
 
 from photonfinder.core import StatusReporter, compress, decompress
@@ -49,6 +58,30 @@ def is_compressed(filename):
     return last_ext in compressed_exts.keys()
 
 
+_FITS_EXTS = (".fit", ".fits")
+
+
+class FileKind(Enum):
+    FITS = 1
+    FITS_COMPRESSED = 2
+    XISF = 3
+    OTHER = 4
+
+
+def classify_file_name(filename: str) -> FileKind:
+    """Classify a file name in one splitext pass; same answers as combining Importer.is_xisf_by_name,
+    Importer.is_fits_by_name and is_compressed."""
+    base, ext = os.path.splitext(filename)
+    lc_base, lc_ext = base.lower(), ext.lower()
+    if ext in compressed_exts:
+        return FileKind.FITS_COMPRESSED if lc_base.endswith(_FITS_EXTS) else FileKind.OTHER
+    if lc_ext == ".xisf":
+        return FileKind.XISF
+    if lc_ext in _FITS_EXTS or (lc_ext in compressed_exts and lc_base.endswith(_FITS_EXTS)):
+        return FileKind.FITS
+    return FileKind.OTHER
+
+
 def read_fits_header(file: str | Path, status_reporter: StatusReporter = None) -> bytes | None:
     """
     Read the FITS header from a file.
@@ -67,10 +100,9 @@ def read_fits_header(file: str | Path, status_reporter: StatusReporter = None) -
         status_reporter.update_status(f"Reading FITS header for {file}...", bulk=True)
     try:
         with fopen(file) as f:
-            header = bytes()
+            blocks = []
             block_size = 2880
             line_size = 80
-            lines_per_block = block_size // line_size
 
             while True:
                 block = f.read(block_size)
@@ -79,25 +111,17 @@ def read_fits_header(file: str | Path, status_reporter: StatusReporter = None) -
                     log(ERROR, f"End block not found in FITS file: {file}")
                     return None
 
-                if len(header) == 0:  # first block
+                if not blocks:  # first block
                     if not block[:80].decode('ascii').startswith('SIMPLE  ='):
                         log(ERROR, f"Cannot decode as FITS file: {file}")
                         return None
 
-                header += block
-
-                # search for END in the block
-                for i in range(lines_per_block):
-                    start = i * line_size
-                    end = start + line_size
-                    if start >= len(block):
-                        break
-
-                    line = block[start:end].decode('ascii', errors='replace').rstrip()
+                blocks.append(block)
 
-                    # Check if this line starts with 'END'
-                    if line.startswith('END'):
-                        return header
+                # search for a line starting with END in the block, comparing bytes in place
+                for start in range(0, len(block), line_size):
+                    if block.startswith(b'END', start):
+                        return b''.join(blocks)
 
     except Exception as e:
         log(DEBUG, f"Error reading FITS header from {file}: {str(e)}")
@@ -145,36 +169,89 @@ def update_fits_header_cache(change_list, status_reporter, settings):
         status_reporter.update_status("Updating FITS header cache...")
 
     # Process new files
-    for file in [*change_list.new_files, *change_list.changed_files]:
-        _handle_file_metadata(file, status_reporter, settings)
+    _handle_files_metadata([*change_list.new_files, *change_list.changed_files], status_reporter, settings)
 
-    # Process removed files
-    for file in change_list.removed_files:
-        try:
-            # Delete any Image objects for this file
-            Image.delete().where(Image.file == file).execute()
-            # Delete the FitsHeader
-            FitsHeader.delete().where(FitsHeader.file == file).execute()
-        except FitsHeader.DoesNotExist:
-            pass
+    # Process removed files: drop their Image and FitsHeader rows
+    for batch in chunked([file.rowid for file in change_list.removed_files], 500):
+        Image.delete().where(Image.file.in_(batch)).execute()
+        FitsHeader.delete().where(FitsHeader.file.in_(batch)).execute()
 
     if status_reporter:
         status_reporter.update_status("FITS header cache updated.")
 
 
-def _handle_file_metadata(file, status_reporter, settings):
-    header = None
-    if Importer.is_fits_by_name(file.name):
-        header_bytes = read_fits_header(file.full_filename(), status_reporter)
+def apply_changes(change_list, status_reporter, settings):
+    """
+    Apply the change_list and update the FITS header cache for it.
+
+    Args:
+        change_list: A ChangeList object with new_files, changed_files, and removed_files
+        status_reporter: StatusReporter to update status
+        settings:  Settings object to update known keywords
+    """
+    # not one transaction for both: the header reads (possibly from network shares) would hold the write lock,
+    # and writes from the UI thread could time out on it. The header cache commits per chunk, after its reads.
+    change_list.apply_all()
+    update_fits_header_cache(change_list, status_reporter, settings)
+
+
+# new/changed files per change list while scanning a library, so the scan applies and reports as it goes
+SCAN_CHUNK_SIZE = 500
+
+# header reads are I/O bound: a few threads overlap the file opens, leaving cores for the UI and the DB writes
+_HEADER_READ_WORKERS = max(2, (os.cpu_count() or 1) - 3)
+_HEADER_READ_CHUNK = 256
+
+
+def _handle_files_metadata(files: typing.Iterable[File], status_reporter, settings) -> typing.List[File]:
+    """Read the headers of *files* on a small thread pool, storing the results on the calling thread.
+
+    Only the reading and parsing run on the pool; the database is touched from this thread alone.
+    Returns the files whose header could not be read.
+    """
+    unreadable = []
+
+    def store(batch, results):
+        # wait for the chunk's reads before taking the write lock
+        results = list(results)
+        # one commit per chunk rather than one per inserted row
+        with File._meta.database.atomic():
+            for file, (header_bytes, header) in zip(batch, results):
+                _store_file_metadata(file, header_bytes, header, status_reporter, settings)
+                if not header_bytes:
+                    unreadable.append(file)
+
+    with ThreadPoolExecutor(max_workers=_HEADER_READ_WORKERS) as executor:
+        previous = None
+        for batch in chunked(files, _HEADER_READ_CHUNK):
+            # full_filename() may need the root from the database, resolve it here
+            paths = [(file.name, file.full_filename()) for file in batch]
+            # map() submits the whole chunk right away: the pool reads it while the previous one is stored
+            results = executor.map(lambda path: _read_file_metadata(*path, status_reporter), paths)
+            if previous is not None:
+                store(*previous)
+            previous = (batch, results)
+        if previous is not None:
+            store(*previous)
+    return unreadable
+
+
+def _read_file_metadata(name: str, full_filename: str, status_reporter) -> tuple[bytes | None, Header | None]:
+    if Importer.is_fits_by_name(name):
+        header_bytes = read_fits_header(full_filename, status_reporter)
         if header_bytes:
-            FitsHeader(file=file, header=compress(header_bytes)).save()
             # Normalize the header and create an Image object if possible
-            header = parse_FITS_header(header_bytes)
-    elif Importer.is_xisf_by_name(file.name):
-        header_bytes, header_dict = read_xisf_header(file.full_filename(), status_reporter)
+            return header_bytes, parse_FITS_header(header_bytes)
+    elif Importer.is_xisf_by_name(name):
+        header_bytes, header_dict = read_xisf_header(full_filename, status_reporter)
         if header_bytes:
-            FitsHeader(file=file, header=compress(header_bytes)).save()
-            header = header_from_xisf_dict(header_dict)
+            return header_bytes, header_from_xisf_dict(header_dict)
+    return None, None
+
+
+def _store_file_metadata(file, header_bytes: bytes | None, header: Header | None, status_reporter, settings):
+    if header_bytes:
+        FitsHeader(file=file, header=compress(header_bytes)).save()
     if header is not None:
         settings.add_known_fits_keywords(header.keys())
         image = normalize_fits_header(file, header, status_reporter)
@@ -236,6 +313,62 @@ def header_from_xisf_dict(header_dict: dict[str, list]) -> Header:
     return repair_header(result)
 
 
+@functools.lru_cache(maxsize=256)
+def _wcs_cards(wcs_text: str | bytes) -> tuple:
+    # parsed once per distinct solution: the frames of a mosaic panel or a re-export share the same few
+    wcs_header = Header.fromstring(wcs_text)
+    # card by card, so each COMMENT/HISTORY line is copied on its own
+    return tuple((card.keyword, card.value) for card in wcs_header.cards if not card.keyword.startswith('NAXIS'))
+
+
+def apply_wcs_text(header: Header, wcs_text: str | bytes | None) -> Header:
+    """Copy the WCS cards of a stored plate-solve solution (as text) into *header*, keeping its NAXIS cards."""
+    if wcs_text:
+        for key, value in _wcs_cards(wcs_text):
+            header[key] = value
+    return header
+
+
+def apply_custom_headers(header: Header, custom_headers: dict | None) -> Header:
+    """Set user supplied KEY=value cards on *header*, keeping the comments of cards that already exist.
+
+    Plain item assignment on purpose: Header.extend(update=True) and Header.update() are both slower for the
+    handful of cards involved and drop the existing comments.
+    """
+    for key, value in (custom_headers or {}).items():
+        header[key] = value
+    return header
+
+
+def write_hdu(hdu: PrimaryHDU, output_file_path: str, output_verify: str = 'silentfix'):
+    """Serialize in memory, then write the file in one go: astropy's writer otherwise issues a write per
+    2880-byte block, which is very slow on network shares."""
+    buffer = io.BytesIO()
+    hdu.writeto(buffer, output_verify=output_verify)
+    with open(output_file_path, 'wb') as fd:
+        fd.write(buffer.getbuffer())
+
+
+def convert_xisf_to_fits(source_path: str, output_file_path: str, wcs_text: str | bytes | None = None,
+                         custom_headers: dict | None = None):
+    """Write the first image of an XISF file that carries FITS keywords as a FITS file.
+
+    A plain module-level function of picklable arguments, so callers can run it in a worker process.
+    """
+    xisf = XISF(source_path)
+    for i, meta in enumerate(xisf.get_images_metadata()):
+        if "FITSKeywords" in meta:
+            header = header_from_xisf_dict(meta["FITSKeywords"])
+            image_data = np.squeeze(xisf.read_image(i, 'channels_first'))
+            apply_wcs_text(header, wcs_text)
+            apply_custom_headers(header, custom_headers)
+            # uint16 sensor data is kept as BITPIX=16 + BZERO=32768 by astropy, no promotion to a wider type.
+            # The header went through repair_header already, so the verifier pass is skipped.
+            write_hdu(PrimaryHDU(data=image_data, header=header), output_file_path, output_verify='ignore')
+            return
+    raise Exception(f"No suitable image with FITS keywords found in XISF file: {source_path}")
+
+
 def parse_FITS_header(header_bytes: bytes) -> Header:
     if b'\x09' in header_bytes:
         # log(WARN, f"FITS header contains tab characters: {header_bytes}")
@@ -243,6 +376,93 @@ def parse_FITS_header(header_bytes: bytes) -> Header:
     return repair_header(Header.fromstring(header_bytes))
 
 
+# a quoted string, followed by nothing but blanks or a comment
+_FITS_STRING_VALUE = re.compile(r"'((?:[^']|'')*)' *(?:/.*)?")
+# the fixed-format integer and real grammar of the FITS standard; astropy also reads looser forms, leave those to it
+_FITS_INTEGER_VALUE = re.compile(r"[+-]?[0-9]+")
+_FITS_REAL_VALUE = re.compile(r"[+-]?(?:\.[0-9]+|[0-9]+(?:\.[0-9]*)?)(?:[DE][+-]?[0-9]+)?")
+
+
+def _parse_card_value(text: str):
+    """Value of a card from its value field (columns 11-80), typed like astropy does; raises ValueError if
+    it is not a plain string, logical, integer or real."""
+    text = text.lstrip()
+    if text.startswith("'"):
+        match = _FITS_STRING_VALUE.fullmatch(text)
+        if not match:
+            raise ValueError(text)
+        return match.group(1).replace("''", "'").rstrip()
+    text = text.split('/', 1)[0].strip()
+    if text == 'T':
+        return True
+    if text == 'F':
+        return False
+    if _FITS_INTEGER_VALUE.fullmatch(text):
+        return int(text)
+    if _FITS_REAL_VALUE.fullmatch(text):
+        return float(text.replace('D', 'E'))
+    raise ValueError(text)  # undefined, complex or not a FITS number
+
+
+def fits_header_values(header_bytes: bytes, keywords: typing.Collection[str] = None) -> dict[str, typing.Any] | None:
+    """
+    Keyword values of a FITS header, without building an astropy ``Header``.
+
+    For reading a few keywords from many headers. Only plain cards are handled: returns None
+    for headers with tabs, non-ASCII text, HIERARCH or CONTINUE cards, or values that are not
+    a string, logical, integer or real, so the caller can fall back to ``parse_FITS_header``.
+    Commentary cards are skipped; for repeated keywords the first value is kept, as ``Header.get`` does.
+
+    With *keywords* (plain keywords of up to 8 characters), only the cards of those keywords are
+    decoded and only they need to be plain.
+    """
+    if keywords is not None:
+        return _fits_keyword_values(header_bytes, {keyword.upper().ljust(8).encode('ascii') for keyword in keywords})
+    if b'\x09' in header_bytes:
+        return None
+    try:
+        text = header_bytes.decode('ascii')
+    except UnicodeDecodeError:
+        return None
+    values = {}
+    for start in range(0, len(text), 80):
+        card = text[start:start + 80]
+        keyword = card[:8].rstrip().upper()
+        if keyword == 'END':
+            break
+        if keyword in ('HIERARCH', 'CONTINUE'):
+            return None
+        if card[8:10] != '= ' or keyword in ('', 'COMMENT', 'HISTORY') or keyword in values:
+            continue  # commentary or blank card, or a repeat
+        try:
+            values[keyword] = _parse_card_value(card[10:])
+        except ValueError:
+            return None
+    return values
+
+
+def _fits_keyword_values(header_bytes: bytes, wanted: set[bytes]) -> dict[str, typing.Any] | None:
+    # compares the raw 8-byte keyword field of each card; only the matching cards are decoded
+    values = {}
+    for start in range(0, len(header_bytes), 80):
+        key = header_bytes[start:start + 8].upper()
+        if key == b'END     ':
+            break
+        if key not in wanted or header_bytes[start + 8:start + 10] != b'= ':
+            continue
+        keyword = key.rstrip().decode('ascii')
+        if keyword in values:
+            continue
+        value = header_bytes[start + 10:start + 80]
+        if b'\x09' in value or header_bytes.startswith(b'CONTINUE', start + 80):
+            return None
+        try:
+            values[keyword] = _parse_card_value(value.decode('ascii'))
+        except (UnicodeDecodeError, ValueError):
+            return None
+    return values
+
+
 def build_wcs_from_header(file: File, header: Header) -> 'FileWCS | None':
     """Build a (not-yet-persisted) FileWCS from a plate-solve solution embedded in *header*.
 
@@ -276,16 +496,24 @@ def decode_header_blob(blob: bytes) -> Header:
     as the raw header bytes. The blob's first byte distinguishes the two. This is the
     single decode path used wherever a cached header is read back from the database.
     """
-    raw = decompress(blob)
+    return decode_header_bytes(decompress(blob))
+
+
+def decode_header_bytes(raw: bytes) -> Header:
+    """Parse an already decompressed header blob, see decode_header_blob."""
     if raw.startswith(b'{'):
-        return header_from_xisf_dict(json.loads(raw))
+        return header_from_xisf_dict(json.loads(raw))  # json accepts the bytes as they are
     return parse_FITS_header(raw)
 
 
-def check_missing_header_cache(status_reporter, settings):
+def check_missing_header_cache(status_reporter, settings, unreadable: dict[int, tuple[int, int]] | None = None):
     """
     Process any FITS files that don't have a corresponding header entry.
     Also creates Image objects from the FITS headers using the appropriate handler.
+
+    *unreadable* maps the rowid of a file whose header could not be read to its (mtime_millis, size) at the
+    time. Such files are skipped while unchanged instead of being read again on every scan; the dict is
+    updated in place.
     """
     if status_reporter:
         status_reporter.update_status("Checking for FITS files without header cache entries...")
@@ -293,13 +521,19 @@ def check_missing_header_cache(status_reporter, settings):
     # Find all files that don't have a corresponding FitsHeader entry
     # Use a LEFT OUTER JOIN to find files without headers
     missing_header_files = (File
-                            .select(File)
-                            .join(FitsHeader, JOIN.LEFT_OUTER, on=(File.rowid == FitsHeader.file))
+                            .select(File, LibraryRoot)
+                            .join_from(File, LibraryRoot)
+                            .join_from(File, FitsHeader, JOIN.LEFT_OUTER, on=(File.rowid == FitsHeader.file))
                             .where(FitsHeader.rowid.is_null()))
 
+    files = list(missing_header_files)
+    if unreadable is not None:
+        files = [file for file in files if unreadable.get(file.rowid) != (file.mtime_millis, file.size)]
+
     # Process these files as new files
-    for file in missing_header_files:
-        _handle_file_metadata(file, status_reporter, settings)
+    failed = _handle_files_metadata(files, status_reporter, settings)
+    if unreadable is not None:
+        unreadable.update((file.rowid, (file.mtime_millis, file.size)) for file in failed)
 
     if status_reporter:
         status_reporter.update_status("FITS header cache updated.")
@@ -331,14 +565,15 @@ class ChangeList:
             # note that bulk_create does not assign the rowid, and we need this later on, hence the loop.
             for file in self.new_files:
                 file.save(force_insert=True)
-            for file in self.removed_files:
-                file.delete_instance()
+            # deletes go out as one IN (...) statement per batch rather than one statement per file
+            for batch in chunked([file.rowid for file in self.removed_files], 500):
+                File.delete().where(File.rowid.in_(batch)).execute()
             for file in self.changed_files:
                 file.save()
-                # If the file is changed, we want to re-examine its contents but don't disconnect it from any projects
-                Image.delete().where(Image.file == file).execute()
-                FitsHeader.delete().where(FitsHeader.file == file).execute()
-                FileWCS.delete().where(FileWCS.file == file).execute()
+            # If the file is changed, we want to re-examine its contents but don't disconnect it from any projects
+            for batch in chunked([file.rowid for file in self.changed_files], 500):
+                for table in (Image, FitsHeader, FileWCS):
+                    table.delete().where(table.file.in_(batch)).execute()
 
 
 def possible_compressed_variants(filename: str):
@@ -388,6 +623,43 @@ def compress_file(src_path: str, ext: str, verify: bool, level: int = 9) -> tupl
     return dest_path, new_size
 
 
+class _OSDirEntry:
+    """The parts of fs.info.Info that the library scan reads, backed by an os.DirEntry. The type comes with the
+    directory listing; the stat is only taken for the files that are actually recorded (and on Windows it comes
+    with the listing as well), where OSFS.scandir stats every entry up front."""
+    __slots__ = ('_entry', 'name', 'is_dir', 'is_file')
+
+    def __init__(self, entry: os.DirEntry):
+        self._entry = entry
+        self.name = entry.name
+        self.is_dir = entry.is_dir()
+        self.is_file = not self.is_dir
+
+    @property
+    def size(self) -> int:
+        return self._entry.stat().st_size
+
+    @property
+    def modified(self) -> datetime:
+        return epoch_to_datetime(self._entry.stat().st_mtime)
+
+
+def _scan_dir(root_fs: FS, path: str) -> typing.Iterator[Info | _OSDirEntry]:
+    """List a library directory with the details the scan needs, going straight to os.scandir for local roots."""
+    if isinstance(root_fs, OSFS):
+        with os.scandir(root_fs.getsyspath(path)) as entries:
+            for entry in entries:
+                yield _OSDirEntry(entry)
+    else:
+        yield from root_fs.scandir(path, namespaces=['details'])
+
+
+def _compile_globs(patterns: typing.List[str]) -> re.Pattern:
+    """One alternation of all glob patterns, matching like any(fnmatch.fnmatch(name, p) for p in patterns)
+    for a name that has already been passed through os.path.normcase."""
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns))
+
+
 class Importer:
     status: StatusReporter
 
@@ -396,14 +668,16 @@ class Importer:
         self.status = context.status_reporter
         self.bad_file_patterns = bad_file_patterns.split("|")
         self.bad_dir_patterns = bad_dir_patterns.split("|")
+        self._bad_file_re = _compile_globs(self.bad_file_patterns)
+        self._bad_dir_re = _compile_globs(self.bad_dir_patterns)
 
     def marked_bad(self, f: Info) -> bool:
         """" skips over files that are marked bad """
-        lc_filename = f.name.lower()
+        lc_filename = os.path.normcase(f.name.lower())
         if f.is_file:
-            return any(fnmatch.fnmatch(lc_filename, pattern) for pattern in self.bad_file_patterns)
+            return self._bad_file_re.match(lc_filename) is not None
         elif f.is_dir:
-            return any(fnmatch.fnmatch(lc_filename, pattern) for pattern in self.bad_dir_patterns)
+            return self._bad_dir_re.match(lc_filename) is not None
         else:
             return False
 
@@ -443,20 +717,33 @@ class Importer:
             roots = list(LibraryRoot.select().execute())
         log(INFO, "Scanning for new/changed files in libraries...")
         for root in roots:
-            self.status.update_status(f"importing library root: {root.name}")
-            try:
-                open_fs = fs.open_fs(root.path, writeable=False)
-                ls = open_fs.listdir(".")
-                if len(ls) == 0:
-                    self.status.update_status(f"Skipping empty library: {root.name}")
-                    continue
-                change_list = self.import_files_from(open_fs, root)
-                yield change_list
-            except Exception as err:
-                self.status.update_status(f"Error importing library: {root.name} - {str(err)}")
+            yield from self.import_root(root)
         self.status.update_status("done.")
 
+    def import_root(self, root: LibraryRoot) -> typing.Iterable[ChangeList]:
+        """Scan a single library root in chunks; errors are reported and end the scan of this root only."""
+        self.status.update_status(f"importing library root: {root.name}")
+        try:
+            open_fs = fs.open_fs(root.path, writeable=False)
+            ls = open_fs.listdir(".")
+            if len(ls) == 0:
+                self.status.update_status(f"Skipping empty library: {root.name}")
+                return
+            yield from self.iter_changes_from(open_fs, root, chunk_size=SCAN_CHUNK_SIZE)
+        except Exception as err:
+            self.status.update_status(f"Error importing library: {root.name} - {str(err)}")
+
     def import_files_from(self, root_fs: FS, root: LibraryRoot, start_dir='.') -> ChangeList:
+        result = ChangeList()
+        for change_list in self.iter_changes_from(root_fs, root, start_dir):
+            result.merge(change_list)
+        return result
+
+    def iter_changes_from(self, root_fs: FS, root: LibraryRoot, start_dir='.',
+                          chunk_size: int | None = None) -> typing.Iterator[ChangeList]:
+        """Scan *start_dir* of a library, yielding the changes in chunks of about *chunk_size* new or changed
+        files (one ChangeList for the whole scan without it). Chunks end on directory boundaries, so each can be
+        applied before the scan continues."""
         dir_queue: typing.List[str] = [start_dir]
         all_dirs = set(map(norm_db_path, dir_queue))
         result = ChangeList()
@@ -464,8 +751,11 @@ class Importer:
             current_dir: str = dir_queue.pop()
             self.status.update_status(f"Scanning directory: {root.name}/{current_dir}", bulk=True)
             filtered_files = set()
+            # one query per directory instead of a lookup per file; also serves the eviction below
+            known_files = {file.name: file for file in
+                           File.select().where(File.root == root, File.path == norm_db_path(current_dir))}
             entry: Info
-            for entry in root_fs.scandir(current_dir, namespaces=['details']):
+            for entry in _scan_dir(root_fs, current_dir):
                 if entry.is_dir:
                     if self._dir_filter(entry):
                         dir_path = fs.path.join(current_dir, entry.name)
@@ -476,7 +766,7 @@ class Importer:
                                                   bulk=False)
                 if entry.is_file:
                     if self._file_filter(entry):
-                        name = self._import_file(entry, current_dir, root, result)
+                        name = self._import_file(entry, current_dir, root, result, known_files)
                         filtered_files.add(name)
                     else:
                         # only log this if it was a file that the user could expect us to handle anyway
@@ -485,11 +775,14 @@ class Importer:
                                                       bulk=False)
 
             # evict deleted files
-            query = File.select(File.rowid, File.name).where(File.root == root, File.path == norm_db_path(current_dir))
-            for file in query.execute():
-                if file.name not in filtered_files:
+            for name, file in known_files.items():
+                if name not in filtered_files:
                     result.removed_files.append(file)
 
+            if chunk_size and len(result.new_files) + len(result.changed_files) >= chunk_size:
+                yield result
+                result = ChangeList()
+
         # clean up deleted dirs
         if start_dir == ".":  # only if we saw the whole filesystem
             query = File.select(File.path).distinct().where(File.root == root)
@@ -499,9 +792,11 @@ class Importer:
                     for file in files:
                         result.removed_files.append(file)
 
-        return result
+        yield result
 
-    def _import_file(self, file: Info, rel_path, root, changelist) -> str:
+    def _import_file(self, file: Info, rel_path, root, changelist, known_files: dict[str, File] = None) -> str:
+        """Record *file* as new or changed. *known_files* (name → File) are the rows of its directory,
+        when the caller already loaded them."""
         log(DEBUG, "[root %s] record file stats: %s/%s", root.name, rel_path, file.name)
 
         rel_path = norm_db_path(rel_path)
@@ -509,10 +804,12 @@ class Importer:
         mtime_millis = int(file.modified.timestamp() * 1000)
 
         possible_file_names = possible_compressed_variants(file.name)
-        query = (File.select().where(
-            (File.root == root) & (File.path == rel_path) & (File.name.in_(possible_file_names, ))))
-
-        results = list(query.execute())
+        if known_files is None:
+            query = (File.select().where(
+                (File.root == root) & (File.path == rel_path) & (File.name.in_(possible_file_names, ))))
+            results = list(query.execute())
+        else:
+            results = [known_files[name] for name in possible_file_names if name in known_files]
         db_file = None
         if len(results) == 1:
             db_file = results[0]
@@ -536,9 +833,14 @@ class Importer:
 
     def import_selection(self, files: typing.List[str]) -> ChangeList:
         changes = ChangeList()
+        root_filesystems = {}  # root path → (root, opened fs), a drop of many files mostly shares one root
         for file in files:
-            root = LibraryRoot.find_for_file(file)
-            root_fs = fs.open_fs(root.path, writeable=False)
+            root, root_fs = next(((r, r_fs) for path, (r, r_fs) in root_filesystems.items()
+                                  if file.startswith(path)), (None, None))
+            if root is None:
+                root = LibraryRoot.find_for_file(file)
+                root_fs = fs.open_fs(root.path, writeable=False)
+                root_filesystems[root.path] = (root, root_fs)
             rel_path = fs.path.relativefrom(root.path, file)
 
             file_info = root_fs.getinfo(rel_path, ["details"])
@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import os.path
 from logging.handlers import TimedRotatingFileHandler
 import sys
@@ -77,4 +78,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # the export runs XISF conversion in worker processes, which need this in a frozen build
+    multiprocessing.freeze_support()
     main()
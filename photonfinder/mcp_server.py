@@ -6,9 +6,9 @@ agents can query the database using the same ``SearchCriteria`` JSON the GUI use
 The server runs *inside* the GUI process (one process owns the SQLite database), served
 over loopback HTTP via FastMCP/uvicorn on a dedicated daemon thread. Blocking database
 work is offloaded to worker threads with ``anyio.to_thread.run_sync`` and wrapped in
-``context.database.bind_ctx(CORE_MODELS)`` -- the same pattern the Qt ``BackgroundLoader``
-workers use, so every worker thread gets its own peewee connection and the event loop
-stays responsive.
+``context.database.connection_context()`` -- the same pattern the Qt ``BackgroundLoader``
+workers use, so every worker thread checks out its own pooled connection, returns it when
+the query is done, and the event loop stays responsive.
 
 The tool/serialization layer (``build_mcp``) is transport-agnostic; only
 ``McpServerController`` is tied to the embedded HTTP transport.
@@ -25,7 +25,7 @@ from peewee import JOIN
 
 from photonfinder.core import ApplicationContext
 from photonfinder.models import (
-    CORE_MODELS, CATALOG_MODELS, SearchCriteria, File, Image, LibraryRoot, Project,
+    SearchCriteria, File, Image, LibraryRoot, Project,
     ProjectFile, FitsHeader, FileWCS, CatalogEntry,
     search_files as run_search_files, serialize_search_row, _SERIALIZED_IMAGE_FIELDS,
 )
@@ -87,7 +87,7 @@ def query_search(context: ApplicationContext, criteria: Optional[dict] = None,
     if dropped:
         logger.debug("search_files: dropping unknown criteria fields: %s", sorted(dropped))
     logger.debug("search_files: criteria=%s page=%d page_size=%d", clean, page, page_size)
-    with context.database.bind_ctx(CORE_MODELS):
+    with context.database.connection_context():
         sc = SearchCriteria.from_json(json.dumps(clean))
         rows, total, has_more = run_search_files(sc, page, page_size)
         logger.debug("search_files: returned %d rows (total=%d, has_more=%s)",
@@ -102,7 +102,7 @@ def query_search(context: ApplicationContext, criteria: Optional[dict] = None,
 
 
 def query_library_roots(context: ApplicationContext) -> list[dict]:
-    with context.database.bind_ctx(CORE_MODELS):
+    with context.database.connection_context():
         return [{"rowid": r.rowid, "name": r.name, "path": r.path}
                 for r in LibraryRoot.select().order_by(LibraryRoot.name)]
 
@@ -127,12 +127,12 @@ def _serialize_project(p: Project) -> dict:
 
 
 def query_projects(context: ApplicationContext) -> list[dict]:
-    with context.database.bind_ctx(CORE_MODELS):
+    with context.database.connection_context():
         return [_serialize_project(p) for p in Project.list_projects_with_image_data()]
 
 
 def query_project_details(context: ApplicationContext, rowid: int) -> dict:
-    with context.database.bind_ctx(CORE_MODELS):
+    with context.database.connection_context():
         for p in Project.list_projects_with_image_data():
             if p.rowid == rowid:
                 return _serialize_project(p)
@@ -144,7 +144,7 @@ def query_distinct_values(context: ApplicationContext, field: str) -> list:
     if column is None:
         raise ValueError(
             f"Unknown field '{field}'. Valid fields: {', '.join(sorted(DISTINCT_FIELDS))}.")
-    with context.database.bind_ctx(CORE_MODELS):
+    with context.database.connection_context():
         query = (Image.select(column)
                  .where(column.is_null(False))
                  .distinct()
@@ -153,7 +153,7 @@ def query_distinct_values(context: ApplicationContext, field: str) -> list:
 
 
 def query_file_details(context: ApplicationContext, rowid: int) -> dict:
-    with context.database.bind_ctx(CORE_MODELS):
+    with context.database.connection_context():
         file = (File.select(File, Image, LibraryRoot)
                 .join_from(File, LibraryRoot)
                 .join_from(File, Image, JOIN.LEFT_OUTER)
@@ -200,14 +200,14 @@ def query_file_details(context: ApplicationContext, rowid: int) -> dict:
 
 
 def query_list_catalogs(context: ApplicationContext) -> list[str]:
-    with context.database.bind_ctx(CATALOG_MODELS):
+    with context.database.connection_context():
         return [row[0] for row in
                 CatalogEntry.select(CatalogEntry.catalog).distinct()
                 .order_by(CatalogEntry.catalog).tuples()]
 
 
 def query_lookup_object(context: ApplicationContext, catalog: str, catalog_id: str) -> dict:
-    with context.database.bind_ctx(CATALOG_MODELS):
+    with context.database.connection_context():
         entry = (CatalogEntry
                  .select()
                  .where(
@@ -2,9 +2,8 @@ import json
 import logging
 import os
 import typing
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from functools import cmp_to_key
 from pathlib import Path
 from typing import Optional
 
@@ -42,8 +41,8 @@ class SearchCriteria:
     offset: int | None = None
     gain: str = ""
     temperature: str = ""
-    coord_ra: str = ""  # Right Ascension in hours (can be in various formats)
-    coord_dec: str = ""  # Declination in degrees (can be in various formats)
+    coord_ra: str | float = ""  # Right Ascension in hours (decimal hours, or a string in various formats)
+    coord_dec: str | float = ""  # Declination in degrees (decimal degrees, or a string in various formats)
     coord_radius: float = 0.5  # Search radius in decimal degrees
     coord_query: str = ""  # Object name/catalog ID the coordinates were looked up from, if any
     start_datetime: datetime | None = None
@@ -79,6 +78,10 @@ class SearchCriteria:
     def is_empty(self):
         return self == SearchCriteria()
 
+    def has_coords(self) -> bool:
+        # numeric coordinates may legitimately be 0.0, so don't rely on truthiness
+        return self.coord_ra not in ("", None) and self.coord_dec not in ("", None)
+
     def __str__(self):
         result = []
         if self.paths:
@@ -97,12 +100,12 @@ class SearchCriteria:
             result.append("Unsolved")
         if self.project:
             result.append(self.project.name)
-        if self.coord_ra and self.coord_dec:
+        if self.has_coords():
             if self.coord_query:
                 result.append(f"{self.coord_query} ±{self.coord_radius:.1f}°")
             else:
-                short_ra = self.coord_ra.split('.')[0]
-                short_dec = self.coord_dec.split('.')[0]
+                short_ra = str(self.coord_ra).split('.')[0]
+                short_dec = str(self.coord_dec).split('.')[0]
                 result.append(f"({short_ra}{short_dec}) ±{self.coord_radius:.1f}°")
         if self.start_datetime and self.end_datetime:
             result.append(f"{self.start_datetime.isoformat()} to {self.end_datetime.isoformat()}")
@@ -233,6 +236,11 @@ class SearchCriteria:
             criteria.end_datetime = None
         return criteria
 
+    def clone(self) -> 'SearchCriteria':
+        """Cheap copy for per-item tweaks: scalars and model references are shared, only the paths list is
+        duplicated. Use instead of deepcopy/JSON round-trips in loops."""
+        return replace(self, paths=list(self.paths))
+
     @staticmethod
     def _serialize(value):
         if isinstance(value, datetime):
@@ -388,17 +396,15 @@ class File(Model):
 
     @staticmethod
     def remove_already_mapped(project: 'Project', selected_files: typing.List['File']) -> typing.List['File']:
-        selected_file_ids = [file.rowid for file in selected_files]
-        already_linked_file_ids = (
-            ProjectFile
-            .select(ProjectFile.file_id)
-            .where(
-                (ProjectFile.project == project) &
-                (ProjectFile.file_id.in_(selected_file_ids))
-            )
-            .distinct()
-        )
-        already_linked_ids_set = set(row.file_id for row in already_linked_file_ids)
+        # (project, file) is uniquely indexed; chunk the ids to stay under SQLite's bound-parameter limit and
+        # read plain tuples rather than building ProjectFile instances just to take their file id.
+        already_linked_ids_set = set()
+        for batch in chunked([file.rowid for file in selected_files], 500):
+            already_linked_ids_set.update(
+                file_id for (file_id,) in ProjectFile
+                .select(ProjectFile.file_id)
+                .where((ProjectFile.project == project) & (ProjectFile.file_id.in_(batch)))
+                .tuples())
         return [file for file in selected_files if file.rowid not in already_linked_ids_set]
 
 
@@ -434,7 +440,7 @@ class Image(Model):
 
     def get_sky_coord(self) -> SkyCoord | None:
         return SkyCoord(self.coord_ra, self.coord_dec, unit=u.deg,
-                        frame='icrs') if self.coord_ra and self.coord_dec else None
+                        frame='icrs') if self.coord_ra is not None and self.coord_dec is not None else None
 
     @staticmethod
     def apply_search_criteria(query, criteria, exclude_ref=None):
@@ -541,13 +547,18 @@ class Image(Model):
             conditions.append(Image.date_obs <= criteria.end_datetime)
 
         # Filter by coordinates
-        if criteria.coord_ra and criteria.coord_dec and exclude_ref is not Image.coord_pix256:
+        if criteria.has_coords() and exclude_ref is not Image.coord_pix256:
             try:
-                # Parse RA and DEC from strings to SkyCoord
-                coords = SkyCoord(criteria.coord_ra, criteria.coord_dec, unit=(u.hourangle, u.deg), frame='icrs')
+                if isinstance(criteria.coord_ra, (int, float)) and isinstance(criteria.coord_dec, (int, float)):
+                    # already numeric, no parsing needed
+                    ra, dec = criteria.coord_ra * u.hourangle, criteria.coord_dec * u.deg
+                else:
+                    # Parse RA and DEC from strings to SkyCoord
+                    coords = SkyCoord(criteria.coord_ra, criteria.coord_dec, unit=(u.hourangle, u.deg), frame='icrs')
+                    ra, dec = coords.ra, coords.dec
                 # Get pixels in the cone
                 radius = criteria.coord_radius * u.deg
-                pixels = hp.cone_search_skycoord(coords, radius)
+                pixels = hp.cone_search_lonlat(ra, dec, radius)
 
                 # Filter images where coord_pix256 is in the list of pixels
                 if len(pixels) > 0:
@@ -698,11 +709,14 @@ class Project(Model):
                                                    on=((Project.rowid == image_coord.c.project_id) & (
                                                            image_coord.c.rn == 1))))
 
-        def dist(project: Project):
-            return coord.separation(project.image.get_sky_coord())
-
-        raw_list.sort(key=cmp_to_key(lambda p1, p2: dist(p1) - dist(p2)))
-        return raw_list[:9]
+        if not raw_list:
+            return raw_list
+        # one vectorised separation for all candidates instead of two SkyCoords per sort comparison
+        candidates = SkyCoord([p.image.coord_ra for p in raw_list], [p.image.coord_dec for p in raw_list],
+                              unit=u.deg, frame='icrs')
+        distances = coord.separation(candidates).deg
+        order = sorted(range(len(raw_list)), key=distances.__getitem__)
+        return [raw_list[i] for i in order[:9]]
 
     @staticmethod
     def list_projects_with_image_data() -> typing.List['Project']:
@@ -783,6 +797,41 @@ class ProjectFile(Model):
             return file.projectfile
         return ProjectFile(project=project, file=file)
 
+    @classmethod
+    def find_by_filenames(cls, full_paths: typing.Iterable[str], project: Project) -> dict[str, 'ProjectFile']:
+        """Batched find_by_filename: maps each of *full_paths* that is in the database to its (possibly new) link.
+
+        Candidates are selected by file name, a chunk of names per query, and matched on the full path here. The
+        image of each file, if any, is loaded along with it.
+        """
+        by_lower_path: dict[str, list[str]] = {}
+        names = set()
+        for full_path in full_paths:
+            normalized_path = norm_db_path_sep(full_path)
+            by_lower_path.setdefault(normalized_path.lower(), []).append(full_path)
+            names.add(str(Path(normalized_path).name))
+
+        result = {}
+        for batch in chunked(names, 500):
+            query = (File.select(File, LibraryRoot, ProjectFile, Image)
+                     .join(LibraryRoot)
+                     .join_from(File, ProjectFile, JOIN.LEFT_OUTER,
+                                on=((File.rowid == ProjectFile.file) & (ProjectFile.project == project)))
+                     .join_from(File, Image, JOIN.LEFT_OUTER)
+                     .where(File.name.in_(batch)))
+            for file in query:
+                matching_paths = by_lower_path.get((file.root.path + file.path + file.name).lower())
+                if not matching_paths:
+                    continue
+                if hasattr(file, 'projectfile'):
+                    project_file = file.projectfile
+                    project_file.file = file  # the joined instance, with its root and image
+                else:
+                    project_file = ProjectFile(project=project, file=file)
+                for full_path in matching_paths:
+                    result[full_path] = project_file
+        return result
+
 
 class FitsHeader(Model):
     """
@@ -879,13 +928,15 @@ def _build_search_query(search_criteria: SearchCriteria):
     return query, fields
 
 
-def search_files(search_criteria: SearchCriteria, page: int = 0, page_size: int = 100):
+def search_files(search_criteria: SearchCriteria, page: int = 0, page_size: int = 100, total: int | None = None):
     """Run a paginated file search for the given criteria.
 
     Returns (rows, total, has_more) where `rows` are File model instances with joined
     Image / LibraryRoot data and aliased columns (has_wcs, project_names, stats_*).
-    `page` is zero-based. Must be called with the models bound to a database
-    (e.g. inside `context.database.bind_ctx(CORE_MODELS)`).
+    `page` is zero-based. Pass the `total` returned for an earlier page of the same
+    search to skip counting again. The models are bound to the database once, by
+    `ApplicationContext.open_database`; a worker thread only needs a pooled connection
+    (`context.database.connection_context()`).
     """
     query, fields = _build_search_query(search_criteria)
 
@@ -897,12 +948,24 @@ def search_files(search_criteria: SearchCriteria, page: int = 0, page_size: int
             field = field.collate("NOCASE")
         query = query.order_by(field.desc()) if search_criteria.sorting_desc else query.order_by(field.asc())
 
-    total = query.count()
     rows = list(query.paginate(page + 1, page_size))
+    if len(rows) < page_size:
+        total = page * page_size + len(rows)  # last page, no need to count
+    elif total is None:
+        total = _count_search_results(search_criteria)
     has_more = (page + 1) * page_size < total
     return rows, total, has_more
 
 
+def _count_search_results(search_criteria: SearchCriteria) -> int:
+    """COUNT(*) over just the filtering joins: wrapping the full search query would also build the
+    project-names subquery and the stats/WCS joins for every row."""
+    query = (File
+             .select(fn.COUNT(File.rowid))
+             .join_from(File, Image, JOIN.LEFT_OUTER))
+    return Image.apply_search_criteria(query, search_criteria).scalar()
+
+
 _SERIALIZED_IMAGE_FIELDS = (
     "image_type", "camera", "filter", "exposure", "gain", "offset", "binning",
     "set_temp", "telescope", "object_name", "coord_ra", "coord_dec",
@@ -1,6 +1,8 @@
 import logging
 import math
+import os
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 from pathlib import Path
 from typing import Callable, List
 
@@ -10,9 +12,9 @@ from astropy.io.fits import Header
 from astropy.wcs.utils import proj_plane_pixel_scales
 from peewee import JOIN, fn
 
-from photonfinder.core import ApplicationContext, compress, decompress
+from photonfinder.core import ApplicationContext, compress, decompress, backup_database
 from photonfinder.fits_handlers import normalize_fits_header
-from photonfinder.models import CORE_MODELS, File, Image, LibraryRoot, FitsHeader, SearchCriteria, FileWCS, ProjectFile, \
+from photonfinder.models import File, Image, LibraryRoot, FitsHeader, SearchCriteria, FileWCS, ProjectFile, \
     Project, ImageStats, search_files
 from photonfinder.image_analysis import analyze_file, ImageAnalysisResult, CALIBRATION_TYPES
 from photonfinder.filesystem import decode_header_blob, build_wcs_from_header
@@ -43,7 +45,7 @@ class BackgroundLoaderBase(QObject):
             @Slot()
             def run(self_runnable):
                 try:
-                    with self.context.database.bind_ctx(CORE_MODELS):
+                    with self.context.database.connection_context():
                         fn(*args, **kwargs)
                 except Exception as e:
                     logging.error(f"Error in worker thread: {e}")
@@ -61,8 +63,7 @@ class GenericControlLoader(BackgroundLoaderBase):
     def _run_tasks(self, tasks: List[tuple[QWidget, Callable]], search_criteria: SearchCriteria):
         for widget, task in tasks:
             try:
-                with self.context.database.bind_ctx(CORE_MODELS):
-                    result = task(search_criteria)
+                result = task(search_criteria)
                 self.data_ready.emit(widget, result)
             except Exception as e:
                 logging.error(f"Error loading data for control {widget.objectName()}: {e}", exc_info=True)
@@ -162,6 +163,7 @@ class SearchResultsLoader(BackgroundLoaderBase):
         self.page_size = 100
         self.current_page = 0
         self.total_results = 0
+        self.total_criteria = None  # the criteria total_results was counted for
         self.last_criteria = None
         self.running = False
 
@@ -173,7 +175,8 @@ class SearchResultsLoader(BackgroundLoaderBase):
         self.current_page = page
         self.last_criteria = search_criteria
         self.running = True
-        self.run_in_thread(self._search_task, search_criteria, page)
+        # a snapshot: the panel edits its criteria in place, the total must stay tied to what was searched
+        self.run_in_thread(self._search_task, search_criteria.clone(), page)
 
     def load_more(self):
         """Load the next page of results using the last search criteria."""
@@ -183,8 +186,13 @@ class SearchResultsLoader(BackgroundLoaderBase):
     def _search_task(self, search_criteria, page):
         """Background task to search for files matching the criteria."""
         try:
-            results, total, has_more = search_files(search_criteria, page, self.page_size)
+            # later pages of the same search reuse the total counted for page 0; if the criteria changed in the
+            # meantime (load_more can fire before the new page 0 is in), count again
+            same_search = page > 0 and search_criteria == self.total_criteria
+            known_total = self.total_results if same_search else None
+            results, total, has_more = search_files(search_criteria, page, self.page_size, known_total)
             self.total_results = total
+            self.total_criteria = search_criteria
 
             # Emit signal with the results
             self.results_loaded.emit(results, page, self.total_results, has_more)
@@ -211,13 +219,11 @@ class ImageReindexWorker(BackgroundLoaderBase):
 
             # Drop and recreate the Image table
             self.context.status_reporter.update_status("Dropping Image table...")
-            with self.context.database.bind_ctx([Image]):
-                Image.drop_table()
-                Image.create_table()
+            Image.drop_table()
+            Image.create_table()
 
             # Get count of headers for progress reporting
-            with self.context.database.bind_ctx([FitsHeader]):
-                total_headers = FitsHeader.select().count()
+            total_headers = FitsHeader.select().count()
 
             self.context.status_reporter.update_status(f"Processing {total_headers} FITS headers...")
 
@@ -226,66 +232,65 @@ class ImageReindexWorker(BackgroundLoaderBase):
             processed = 0
             new_images = []
 
-            with self.context.database.bind_ctx([FitsHeader, File, Image]):
-                # Query all headers with their associated files
-                query = (FitsHeader
-                         .select(FitsHeader, File, FileWCS)
-                         .join(File)
-                         .join(FileWCS, JOIN.LEFT_OUTER))
-
-                # Process each header
-                for header_record in query:
-                    try:
-                        # Deserialize the header
-                        from astropy.io.fits import Header
-                        header = decode_header_blob(header_record.header)
-
-                        if header is None:
-                            continue
-
-                        # There is no information from plate solving with an external tool - try to extract from
-                        # the file header
-                        if not hasattr(header_record.file, 'filewcs'):
-                            wcs = build_wcs_from_header(header_record.file, header)
-                            if wcs is not None:
-                                FileWCS.insert(wcs.__data__).on_conflict_ignore().execute()
-                                setattr(header_record.file, 'filewcs', wcs)
-
-                        self.context.settings.add_known_fits_keywords(header.keys())
-                        # Process the header
-                        image = normalize_fits_header(header_record.file, header, self.context.status_reporter)
-                        if image:
-                            if hasattr(header_record.file, 'filewcs'):
-                                wcs_str = decompress(header_record.file.filewcs.wcs)
-                                wcs_header = Header.fromstring(wcs_str)
-                                ra, dec, healpix, radius = get_image_center_coords(wcs_header)
-                                image.coord_ra = ra
-                                image.coord_dec = dec
-                                image.coord_pix256 = healpix
-                                image.coord_radius = radius
-                            new_images.append(image)
-
-                        # Update progress periodically
-                        processed += 1
-                        if processed % 100 == 0 or processed == total_headers:
-                            self.context.status_reporter.update_status(
-                                f"Processed {processed}/{total_headers} headers...", True)
-
-                        # Bulk save images in batches
-                        if len(new_images) >= batch_size:
-                            with self.context.database.atomic():
-                                Image.bulk_create(new_images)
-                            new_images = []
-
-                    except Exception as e:
-                        logging.error(f"Error processing header: {e}", exc_info=True)
-                        self.context.status_reporter.update_status(f"Error processing header: {str(e)}")
-
-                # Save any remaining images
-                if new_images:
-                    with self.context.database.atomic():
-                        Image.bulk_create(new_images)
-                    self.context.status_reporter.update_status(f"Saved {len(new_images)} images to database", True)
+            # Query all headers with their associated files
+            query = (FitsHeader
+                     .select(FitsHeader, File, FileWCS)
+                     .join(File)
+                     .join(FileWCS, JOIN.LEFT_OUTER))
+
+            # Process each header
+            for header_record in query:
+                try:
+                    # Deserialize the header
+                    from astropy.io.fits import Header
+                    header = decode_header_blob(header_record.header)
+
+                    if header is None:
+                        continue
+
+                    # There is no information from plate solving with an external tool - try to extract from
+                    # the file header
+                    if not hasattr(header_record.file, 'filewcs'):
+                        wcs = build_wcs_from_header(header_record.file, header)
+                        if wcs is not None:
+                            FileWCS.insert(wcs.__data__).on_conflict_ignore().execute()
+                            setattr(header_record.file, 'filewcs', wcs)
+
+                    self.context.settings.add_known_fits_keywords(header.keys())
+                    # Process the header
+                    image = normalize_fits_header(header_record.file, header, self.context.status_reporter)
+                    if image:
+                        if hasattr(header_record.file, 'filewcs'):
+                            wcs_str = decompress(header_record.file.filewcs.wcs)
+                            wcs_header = Header.fromstring(wcs_str)
+                            ra, dec, healpix, radius = get_image_center_coords(wcs_header)
+                            image.coord_ra = ra
+                            image.coord_dec = dec
+                            image.coord_pix256 = healpix
+                            image.coord_radius = radius
+                        new_images.append(image)
+
+                    # Update progress periodically
+                    processed += 1
+                    if processed % 100 == 0 or processed == total_headers:
+                        self.context.status_reporter.update_status(
+                            f"Processed {processed}/{total_headers} headers...", True)
+
+                    # Bulk save images in batches
+                    if len(new_images) >= batch_size:
+                        with self.context.database.atomic():
+                            Image.bulk_create(new_images)
+                        new_images = []
+
+                except Exception as e:
+                    logging.error(f"Error processing header: {e}", exc_info=True)
+                    self.context.status_reporter.update_status(f"Error processing header: {str(e)}")
+
+            # Save any remaining images
+            if new_images:
+                with self.context.database.atomic():
+                    Image.bulk_create(new_images)
+                self.context.status_reporter.update_status(f"Saved {len(new_images)} images to database", True)
 
             self.context.status_reporter.update_status("Image metadata reindexing complete!")
 
@@ -302,6 +307,7 @@ class ProgressBackgroundTask(BackgroundLoaderBase):
     error = Signal(str)
     message = Signal(str)
     total_found = Signal(int)
+    row_update = Signal(int, str)  # progress + message in a single cross-thread event
 
     def __init__(self, context: ApplicationContext):
         super().__init__(context)
@@ -312,6 +318,37 @@ class ProgressBackgroundTask(BackgroundLoaderBase):
     def cancel(self):
         self.cancelled = True
 
+    def should_report(self, index: int) -> bool:
+        """Throttle for per-item progress signals: each emit queues an event on the GUI thread, so fast loops
+        only report about 200 times over the whole run (and always on the last item)."""
+        step = max(1, self.total // 200)
+        return index % step == 0 or index >= self.total - 1
+
+
+class DatabaseBackupTask(ProgressBackgroundTask):
+    """Copies the open database to a file in a background thread, a few pages per step so progress can be shown."""
+    PAGES_PER_STEP = 1024
+
+    def __init__(self, context: ApplicationContext, backup_path: str):
+        super().__init__(context)
+        self.backup_path = backup_path
+
+    def start(self):
+        self.run_in_thread(self._backup)
+
+    def _backup(self):
+        try:
+            backup_database(self.context.database, self.backup_path, pages=self.PAGES_PER_STEP,
+                            progress=self._report_progress)
+            self.finished.emit()
+        except Exception as e:
+            logging.error(f"Error creating database backup: {e}", exc_info=True)
+            self.error.emit(str(e))
+
+    def _report_progress(self, status, remaining, total):
+        self.context.status_reporter.update_status(
+            f"Backing up database... {total - remaining}/{total} pages", bulk=True)
+
 
 class FileProcessingTask(ProgressBackgroundTask):
     def __init__(self, context: ApplicationContext, search_criteria: SearchCriteria, files: List[File]):
@@ -324,28 +361,27 @@ class FileProcessingTask(ProgressBackgroundTask):
 
     def _process_files(self):
         try:
-            if self.files is not None and len(self.files) > 0:
-                self.total = len(self.files)
-                self.total_found.emit(self.total)
-                for i, file in enumerate(self.files):
-                    if self.cancelled:
-                        break
-                    self._process_file(file, i)
-            else:
-                with self.context.database.bind_ctx([File, Image]):
-                    query = self.create_query()
-                    self.total = query.count()
-                    self.total_found.emit(self.total)
-                    for i, file in enumerate(query):
-                        if self.cancelled:
-                            break
-                        self._process_file(file, i)
+            files = self._load_files()
+            self.total = len(files)
+            self.total_found.emit(self.total)
+            for i, file in enumerate(files):
+                if self.cancelled:
+                    break
+                self._process_file(file, i)
+            self._files_processed()
 
             self.finished.emit()
         except Exception as e:
             logging.error(f"Error processing files: {e}", exc_info=True)
             self.error.emit(str(e))
 
+    def _load_files(self) -> List[File]:
+        """The explicit file selection, or the query results fetched in a single pass (no separate COUNT)."""
+        if self.files:
+            return self.files
+        self.total_found.emit(0)  # busy indicator while the query runs
+        return list(self.create_query())
+
     def create_query(self):
         query = (File
                  .select(* self.get_tables())
@@ -356,7 +392,12 @@ class FileProcessingTask(ProgressBackgroundTask):
         return query
 
     def _process_file(self, file, index):
-        self.progress.emit(index)
+        if self.should_report(index):
+            self.progress.emit(index)
+
+    def _files_processed(self):
+        """Called after the last file, before finished is emitted; for work buffered across files."""
+        pass
 
     def get_tables(self) -> List:
         return [File, Image, LibraryRoot]
@@ -411,22 +452,13 @@ class PlateSolveTask(FileProcessingTask):
         self.message.emit(header)
         self.message.emit("")
         try:
-            if self.files is not None and len(self.files) > 0:
-                self.total = len(self.files)
-                self.total_found.emit(self.total)
-                for i, file in enumerate(self.files):
-                    if self.cancelled:
-                        break
-                    self._process_file(file, i)
-            else:
-                with self.context.database.bind_ctx([File, Image]):
-                    query = self.create_query()
-                    self.total = query.count()
-                    self.total_found.emit(self.total)
-                    for i, file in enumerate(query):
-                        if self.cancelled:
-                            break
-                        self._process_file(file, i)
+            files = self._load_files()
+            self.total = len(files)
+            self.total_found.emit(self.total)
+            for i, file in enumerate(files):
+                if self.cancelled:
+                    break
+                self._process_file(file, i)
             solved = len(self.solved_files)
             self.message.emit("")
             if self.total == 0:
@@ -611,26 +643,53 @@ class FileListTask(FileProcessingTask):
             super()._process_files()
 
     def _process_file(self, file, index):
-        self.message.emit(f"Processing file {index + 1}/{self.total}:\n {file.full_filename()}")
         self.fd.write(f"{str(Path(file.full_filename()))}\n")
-        self.progress.emit(index)
+        if self.should_report(index):
+            self.row_update.emit(index, f"Processing file {index + 1}/{self.total}:\n {file.full_filename()}")
 
 
 class ImageAnalysisTask(FileProcessingTask):
-    """Per-file image quality analysis. Stores results in ImageStats (upsert)."""
+    """Per-file image quality analysis. Stores results in ImageStats (upsert).
+
+    The analysis itself (file I/O, background estimation, source extraction) runs on a small thread pool;
+    results are written to the database from the task thread as they complete.
+    """
 
     def __init__(self, context: ApplicationContext,
                  search_criteria: SearchCriteria, files: List[File]):
         super().__init__(context, search_criteria, files)
         self.analyzed_files: list[tuple[File, ImageAnalysisResult]] = []
 
-    def _process_file(self, file: File, index: int):
-        super()._process_file(file, index)
-        self.message.emit(f"Analysing {index + 1}/{self.total}: {file.name}")
+    def _process_files(self):
+        try:
+            files = self._load_files()
+            self.total = len(files)
+            self.total_found.emit(self.total)
+            n_workers = min(4, os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                # resolve paths here: lazy model loads must not hit the database from the pool threads
+                futures = {executor.submit(analyze_file, file.full_filename(),
+                                           detect_sources=self._image_type(file) not in CALIBRATION_TYPES): file
+                           for file in files}
+                for index, future in enumerate(as_completed(futures)):
+                    if self.cancelled:
+                        for f in futures:
+                            f.cancel()
+                        break
+                    self._store_result(futures[future], index, future)
+            self.finished.emit()
+        except Exception as e:
+            logging.error(f"Error processing files: {e}", exc_info=True)
+            self.error.emit(str(e))
+
+    @staticmethod
+    def _image_type(file: File) -> str | None:
+        return file.image.image_type if hasattr(file, 'image') and file.image else None
+
+    def _store_result(self, file: File, index: int, future: Future):
+        self.row_update.emit(index, f"Analysed {index + 1}/{self.total}: {file.name}")
         try:
-            image_type = file.image.image_type if hasattr(file, 'image') and file.image else None
-            detect_sources = image_type not in CALIBRATION_TYPES
-            result = analyze_file(file.full_filename(), detect_sources=detect_sources)
+            result = future.result()
             if result.error:
                 self.message.emit(f"  Warning: {result.error}")
             (ImageStats
@@ -1,6 +1,6 @@
 import csv
 import logging
-from copy import deepcopy
+from dataclasses import replace
 
 from PySide6.QtCore import Signal, Qt
 from PySide6.QtGui import QBrush, QColor
@@ -258,7 +258,7 @@ class CatalogReportWindow(QMainWindow, Ui_CatalogReportWindow):
         from .SearchPanel import SearchPanel
         self.search_panel: SearchPanel = search_panel
         self.search_panel.search_criteria_changed.connect(self.load_report)
-        self.search_panel.mainWindow.tabs_changed.connect(self.on_tabs_changed)
+        self.search_panel.mainWindow.tab_title_changed.connect(self.on_tab_title_changed)
 
         self._loaded_only_matching = False
         self.catalogCombo.currentTextChanged.connect(self._on_catalog_changed)
@@ -275,6 +275,10 @@ class CatalogReportWindow(QMainWindow, Ui_CatalogReportWindow):
     def on_tabs_changed(self):
         self.tabname_label.setText(self.search_panel.title)
 
+    def on_tab_title_changed(self, panel, title: str):
+        if panel is self.search_panel:
+            self.tabname_label.setText(title)
+
     def _populate_catalog_combo(self):
         catalogs = list(
             CatalogEntry.select(CatalogEntry.catalog)
@@ -454,8 +458,8 @@ class CatalogReportWindow(QMainWindow, Ui_CatalogReportWindow):
         )
 
     def _open_in_new_tab(self, root_id, root_label, file_dir, file_name, obj_name):
-        criteria = deepcopy(self.search_panel.search_criteria)
-        criteria.paths = [RootAndPath(root_id=root_id, root_label=root_label, path=file_dir)]
+        criteria = replace(self.search_panel.search_criteria,
+                           paths=[RootAndPath(root_id=root_id, root_label=root_label, path=file_dir)])
         #criteria.paths_as_prefix = False #Inherit this from the origin panel
         if file_name:
             criteria.file_name = file_name
@@ -8,7 +8,7 @@ from peewee import JOIN
 
 from photonfinder.core import ApplicationContext
 from photonfinder.filesystem import compress_file, is_compressible
-from photonfinder.models import File, Image, LibraryRoot, CORE_MODELS, SearchCriteria
+from photonfinder.models import File, Image, LibraryRoot, SearchCriteria
 from photonfinder.ui.BackgroundLoader import BackgroundLoaderBase
 from photonfinder.ui.generated.CompressFilesDialog_ui import Ui_CompressFilesDialog
 
@@ -55,7 +55,8 @@ class CompressFilesWorker(BackgroundLoaderBase):
         try:
             dest_path, new_size = compress_file(file.full_filename(), ext, verify, level)
             new_name = os.path.basename(dest_path)
-            with self.context.database.bind_ctx(CORE_MODELS):
+            # pool threads are not Qt workers: take a pooled connection for the update and hand it back
+            with self.context.database.connection_context():
                 File.update(name=new_name, size=new_size).where(File.rowid == file.rowid).execute()
             self.message.emit(f"OK   {file.name}  →  {new_name}")
         except Exception as e:
@@ -76,13 +77,12 @@ class CompressFilesDialog(QDialog, Ui_CompressFilesDialog):
         if files is not None:
             compressible = [f for f in files if is_compressible(f.name)]
         else:
-            with self.context.database.bind_ctx(CORE_MODELS):
-                query = (File.select(File, Image, LibraryRoot)
-                         .join_from(File, LibraryRoot)
-                         .join_from(File, Image, JOIN.LEFT_OUTER)
-                         .order_by(File.root, File.path, File.name))
-                query = Image.apply_search_criteria(query, search_criteria)
-                compressible = [f for f in query if is_compressible(f.name)]
+            query = (File.select(File, Image, LibraryRoot)
+                     .join_from(File, LibraryRoot)
+                     .join_from(File, Image, JOIN.LEFT_OUTER)
+                     .order_by(File.root, File.path, File.name))
+            query = Image.apply_search_criteria(query, search_criteria)
+            compressible = [f for f in query if is_compressible(f.name)]
 
         for f in compressible:
             label = '/'.join(filter(None, [f.root.name, f.path, f.name]))
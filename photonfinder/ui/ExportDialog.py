@@ -1,28 +1,28 @@
-import copy
 import datetime
 import functools
 import logging
+import multiprocessing
 import os
 import re
 import shutil
 import string
-
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, NamedTuple, Optional
 
-import numpy as np
-from PySide6.QtCore import Signal, QUrl, Qt
+from PySide6.QtCore import Signal, QUrl, Qt, QTimer
 from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (QDialog, QFileDialog, QMessageBox, QDialogButtonBox,
                                 QHeaderView, QLabel, QComboBox, QPushButton, QVBoxLayout,
                                 QPlainTextEdit, QAbstractItemView, QTableWidgetItem)
 from astropy.io import fits
-from peewee import JOIN
+from peewee import JOIN, chunked
 
 from photonfinder.calibration import CalibrationMatcher, CalibrationCandidate, SessionKey, session_date_for
 from photonfinder.core import ApplicationContext, Settings, decompress
-from photonfinder.filesystem import is_compressed, fopen, Importer, header_from_xisf_dict, repair_header
-from photonfinder.models import Image, File, SearchCriteria, FileWCS, Project, ProjectFile
+from photonfinder.filesystem import is_compressed, fopen, Importer, repair_header, apply_wcs_text, write_hdu, \
+    convert_xisf_to_fits, classify_file_name, FileKind, apply_custom_headers
+from photonfinder.models import Image, File, SearchCriteria, FileWCS, Project, ProjectFile, LibraryRoot
 from photonfinder.ui.BackgroundLoader import BackgroundLoaderBase
 from photonfinder.ui.common import coerce_value
 from photonfinder.ui.generated.ExportDialog_ui import Ui_ExportDialog
@@ -43,21 +43,64 @@ def _make_shared_template_str(template_str: str) -> str:
 
 def template_filename_with_ref(file: File, ref: File, template: string.Template, settings: Settings,
                                decompress=False, export_xisf_as_fits=False,
-                               sess_date=None) -> str:
+                               sess_date=None, preview_mode=False) -> str:
     regular_filename = template_filename(file, template, settings, decompress, export_xisf_as_fits,
-                                         sess_date=sess_date)
+                                         sess_date=sess_date, preview_mode=preview_mode)
     if ref is None:
         return regular_filename
     else:
-        ref_filename = template_filename(ref, template, settings, decompress, export_xisf_as_fits)
-        ref_path = Path(ref_filename).parent
-        regular_name = Path(regular_filename).name
-        return os.path.join(ref_path, regular_name)
+        ref_filename = template_filename(ref, template, settings, decompress, export_xisf_as_fits,
+                                         preview_mode=preview_mode)
+        return os.path.join(os.path.dirname(ref_filename), os.path.basename(regular_filename))
+
+
+_IMAGE_TEMPLATE_FIELDS = frozenset({'image_type', 'camera', 'filter', 'exposure', 'gain', 'binning', 'set_temp',
+                                     'telescope', 'object_name'})
+
+
+class _TemplateFields(dict):
+    """Template mapping that computes each field on first lookup, so fields the pattern doesn't use cost nothing."""
+
+    def __init__(self, file: File, image: Image | None, file_name: str, settings: Settings, sess_date=None):
+        super().__init__(filename=file_name, lib_path=file.path)
+        self.image = image
+        self.file_name = file_name
+        self.settings = settings
+        self.sess_date = sess_date
+
+    def __missing__(self, key):
+        value = self._compute(key)
+        self[key] = value
+        return value
+
+    def _compute(self, key):
+        image = self.image
+        if key in _IMAGE_TEMPLATE_FIELDS:
+            return getattr(image, key) if image else None
+        if key == 'date_obs':
+            return image.date_obs.isoformat() if image and image.date_obs else None
+        if key == 'date_minus12':
+            return session_date_for(image.date_obs).isoformat() if image and image.date_obs else None
+        if key == 'date':
+            return image.date_obs.date().isoformat() if image and image.date_obs else None
+        if key == 'sess_date':
+            # sess_date: the date of the light-frame session this file belongs to.
+            # For light frames this equals date_minus12; for calibration frames it is
+            # the session date of the lights they were matched to, which may differ.
+            # Falls back to date_minus12 when no session context is available.
+            return self.sess_date.isoformat() if self.sess_date else self['date_minus12']
+        if key == 'last_light_path':
+            return self.settings.get_last_light_path()
+        if key in ('filename_no_ext', 'ext'):
+            base, ext = os.path.splitext(self.file_name)
+            self['filename_no_ext'], self['ext'] = base, ext.lstrip('.')
+            return self[key]
+        raise KeyError(key)  # unknown placeholder, left as-is by safe_substitute
 
 
 def template_filename(file: File, template: string.Template, settings: Settings,
                       decompress=False, export_xisf_as_fits=False,
-                      sess_date=None) -> str:
+                      sess_date=None, preview_mode=False) -> str:
     image = file.image if hasattr(file, 'image') and file.image else None
     file_name = file.name
 
@@ -66,47 +109,42 @@ def template_filename(file: File, template: string.Template, settings: Settings,
         file_name = os.path.splitext(file_name)[0]
 
     if Importer.is_xisf_by_name(file_name) and export_xisf_as_fits:
-        file_name = str(Path(file_name).with_suffix(".fit"))
-
-    mapping = {
-        'filename': file_name,
-        'lib_path': file.path,
-        'image_type': image.image_type if image else None,
-        'camera': image.camera if image else None,
-        'filter': image.filter if image else None,
-        'exposure': image.exposure if image else None,
-        'gain': image.gain if image else None,
-        'binning': image.binning if image else None,
-        'set_temp': image.set_temp if image else None,
-        'telescope': image.telescope if image else None,
-        'object_name': image.object_name if image else None,
-        'date_obs': image.date_obs.isoformat() if image and image.date_obs else None
-    }
-    if image and image.date_obs:
-        mapping['date_minus12'] = session_date_for(image.date_obs).isoformat()
-        mapping['date'] = image.date_obs.date().isoformat()
-    else:
-        mapping['date_minus12'] = None
-        mapping['date'] = None
-
-    # sess_date: the date of the light-frame session this file belongs to.
-    # For light frames this equals date_minus12; for calibration frames it is
-    # the session date of the lights they were matched to, which may differ.
-    # Falls back to date_minus12 when no session context is available.
-    mapping['sess_date'] = sess_date.isoformat() if sess_date else mapping['date_minus12']
-
-    mapping['last_light_path'] = settings.get_last_light_path()
-    mapping['filename_no_ext'] = os.path.splitext(file_name)[0]
-    mapping['ext'] = os.path.splitext(file_name)[1].lstrip('.')
+        file_name = os.path.splitext(file_name)[0] + ".fit"
 
+    mapping = _TemplateFields(file, image, file_name, settings, sess_date)
     result = template.safe_substitute(mapping)
     if not result:
         result = file_name
-    if image and image.image_type == 'LIGHT':
+    if image and image.image_type == 'LIGHT' and not preview_mode:
         settings.set_last_light_path(Path(result).parent)
     return result
 
 
+def _fast_copy(source_path: str, output_file_path: str, preserve_times: bool = True):
+    """shutil.copy2 equivalent that lets the kernel copy the bytes (copy_file_range) where it can.
+    Without preserve_times it is a shutil.copyfile equivalent: no copystat round-trips."""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(source_path, 'rb') as src, open(output_file_path, 'wb') as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining > 0:
+                raise OSError("copy_file_range stopped early")
+            if preserve_times:
+                shutil.copystat(source_path, output_file_path)
+            return
+        except OSError:
+            pass  # e.g. cross-device on older kernels or unsupported filesystem; shutil picks the next best way
+    if preserve_times:
+        shutil.copy2(source_path, output_file_path)
+    else:
+        shutil.copyfile(source_path, output_file_path)
+
+
 class ExportEntry(NamedTuple):
     """A file paired with the session date that determines its destination folder."""
     file: File
@@ -176,6 +214,23 @@ def collect_calibration_files(
     return result
 
 
+# one match per non-blank line: KEY=VALUE in groups 1-2, anything else (malformed) in group 3
+_HEADER_LINE = re.compile(r'^[ \t]*(?:([^=\n]+?)[ \t]*=[ \t]*(.*?)|(\S.*?))[ \t]*$', re.MULTILINE)
+
+
+def parse_custom_headers(text: str) -> tuple[dict, list[str]]:
+    """Parse KEY=VALUE lines into typed header values; returns the headers and the malformed lines."""
+    parsed = {}
+    bad_lines = []
+    for match in _HEADER_LINE.finditer(text):
+        key, value, bad = match.groups()
+        if bad is not None:
+            bad_lines.append(bad)
+        else:
+            parsed[key] = coerce_value(value)
+    return parsed, bad_lines
+
+
 def build_file_headers_map(
     session_keys: list[SessionKey],
     sessions: dict[SessionKey, list[File]],
@@ -192,16 +247,9 @@ def build_file_headers_map(
         raw = calib_headers.get(row, "")
         if not raw.strip():
             continue
-        parsed = {}
-        for line in raw.strip().split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            if '=' not in line:
-                logging.warning(f"Ignoring malformed custom header line (expected KEY=VALUE): {line!r}")
-                continue
-            k, v = line.split('=', 1)
-            parsed[k.strip()] = coerce_value(v.strip())
+        parsed, bad_lines = parse_custom_headers(raw)
+        for line in bad_lines:
+            logging.warning(f"Ignoring malformed custom header line (expected KEY=VALUE): {line!r}")
         if not parsed:
             continue
         for f in sessions[key]:
@@ -264,13 +312,16 @@ class ExportWorker(BackgroundLoaderBase):
         self.shared_pattern = None
         self.project = None
         self.project_file_ids = set()  # file rowids to add to the project (lights only)
+        self._xisf_pool: ProcessPoolExecutor | None = None
+        self._known_dirs: set[str] = set()  # output directories already created during this export
+        self.preserve_times = True
 
     def export_files(self, search_criteria: SearchCriteria,
                      entries: List[ExportEntry], output_path: str, decompress: bool,
                      pattern: str, total_files: int, export_xisf_as_fits: bool = False,
                      override_platesolve: bool = False, file_headers: dict = None,
                      project: Project = None,
-                     shared_file_ids: set = None, project_file_ids: set = None):
+                     shared_file_ids: set = None, project_file_ids: set = None, preserve_times: bool = True):
         """Start the export process in a background thread."""
         self.search_criteria = search_criteria
         self.entries = entries
@@ -286,66 +337,144 @@ class ExportWorker(BackgroundLoaderBase):
         self.shared_pattern = string.Template(_make_shared_template_str(pattern)) if self.shared_file_ids else None
         self.project = project
         self.project_file_ids = project_file_ids or set()
+        self.preserve_times = preserve_times
         self.run_in_thread(self._export_files_task)
 
     def _export_files_task(self):
         """Background task to export files."""
         try:
-            for i, entry in enumerate(self.entries):
-                if self.cancelled:
-                    break
-                self._process_entry(entry, i)
+            n_workers = min(8, (os.cpu_count() or 1) * 2)
+            if self.export_xisf_as_fits and any(Importer.is_xisf_by_name(e.file.name) for e in self.entries):
+                # only the copy threads submit conversions, so there's no use for more processes than that. Spawn
+                # them: forking this multi-threaded Qt process can deadlock the child
+                self._xisf_pool = ProcessPoolExecutor(max_workers=n_workers,
+                                                      mp_context=multiprocessing.get_context("spawn"))
+            linked_files = {}  # rowid → File, each file is linked once
+            failures = []
+            try:
+                self._copy_entries(n_workers, linked_files, failures)
+            finally:
+                # the files that made it are linked even if the export stopped early
+                self._link_to_project(linked_files.values())
+            if failures:
+                self.error.emit(f"{len(failures)} file(s) could not be exported:\n" + "\n".join(failures))
+                return
             self.finished.emit()
         except Exception as e:
             logging.error(f"Error exporting files: {e}", exc_info=True)
             self.error.emit(str(e))
-
-    def _process_entry(self, entry: ExportEntry, index: int):
-        """Process a single export entry."""
+        finally:
+            if self._xisf_pool:
+                self._xisf_pool.shutdown(cancel_futures=True)
+                self._xisf_pool = None
+
+    def _copy_entries(self, n_workers: int, linked_files: dict, failures: list):
+        """Copy the entries on a thread pool, collecting the files to link and a message per failed file."""
+        claimed_paths = set()
+        self._known_dirs = set()
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = {}
+            for entry in self.entries:
+                # output paths are resolved here, so two entries mapping to the same file can't race
+                output_file_path = self._output_file_path(entry)
+                if output_file_path in claimed_paths:
+                    logging.info(f"File {output_file_path} already exported, skipping")
+                    if self.project and entry.file.rowid in self.project_file_ids:
+                        linked_files[entry.file.rowid] = entry.file
+                    continue
+                claimed_paths.add(output_file_path)
+                futures[executor.submit(self._process_entry, entry, output_file_path)] = entry.file
+            skipped = len(self.entries) - len(futures)
+            last_pct = -1
+            try:
+                for done, future in enumerate(as_completed(futures), start=skipped + 1):
+                    file = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        # keep exporting the other files, the failures are reported at the end
+                        logging.error(f"Error exporting {file.name}: {e}", exc_info=True)
+                        failures.append(f"{file.name}: {e}")
+                    else:
+                        if self.project and file.rowid in self.project_file_ids:
+                            linked_files[file.rowid] = file
+                    if self.cancelled:
+                        break
+                    pct = done * 100 // self.total_files
+                    if pct != last_pct:  # at most 101 distinct values, don't flood the UI thread
+                        self.progress.emit(pct)
+                        last_pct = pct
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _link_to_project(self, files):
+        # one multi-row INSERT per batch instead of a statement per link, all committed together
+        rows = [{'project': self.project, 'file': file} for file in files]
+        with self.context.database.atomic():
+            for batch in chunked(rows, 500):
+                ProjectFile.insert_many(batch).execute()
+
+    def _output_file_path(self, entry: ExportEntry) -> str:
         file = entry.file
-        source_path = file.full_filename()
-        custom_headers = self.file_headers.get(file.rowid, {})
-        sess_date = entry.session_date
-
         is_shared = file.rowid in self.shared_file_ids
         active_pattern = self.shared_pattern if (is_shared and self.shared_pattern) else self.pattern
 
         ref_file = self.search_criteria.reference_file if self.search_criteria else None
         output_filename = template_filename_with_ref(file, ref_file, active_pattern,
                                                      self.context.settings, self.decompress, self.export_xisf_as_fits,
-                                                     sess_date=sess_date)
-        output_file_path = os.path.join(self.output_path, output_filename)
-
-        os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
-        if Path(output_file_path).exists():
-            logging.info(f"File {output_file_path} already exists, skipping")
-        else:
-            logging.info(f"Copying {source_path} to {output_file_path}")
-            self.copy_file(source_path, output_file_path, file, custom_headers)
+                                                     sess_date=entry.session_date)
+        return os.path.join(self.output_path, output_filename)
 
-        if self.project and file.rowid in self.project_file_ids:
-            link = ProjectFile(project=self.project, file=file)
-            link.save()
+    def _process_entry(self, entry: ExportEntry, output_file_path: str):
+        """Process a single export entry. Runs on the copy thread pool."""
+        file = entry.file
+        custom_headers = self.file_headers.get(file.rowid, {})
 
-        self.progress.emit(int((index + 1) / self.total_files * 100))
+        # any lazy model load borrows a pooled connection, returned when this entry is done
+        with self.context.database.connection_context():
+            source_path = file.full_filename()
+            output_dir = os.path.dirname(output_file_path)
+            if output_dir not in self._known_dirs:
+                # a race between copy threads only means a redundant makedirs, exist_ok covers it
+                os.makedirs(output_dir, exist_ok=True)
+                self._known_dirs.add(output_dir)
+            if Path(output_file_path).exists():
+                logging.info(f"File {output_file_path} already exists, skipping")
+            else:
+                logging.info(f"Copying {source_path} to {output_file_path}")
+                self.copy_file(source_path, output_file_path, file, custom_headers)
 
     def copy_file(self, source_path: str, output_file_path: str, file: File, custom_headers: dict = None):
         custom_headers = custom_headers or {}
+        kind = classify_file_name(source_path)
         # XISF
-        if Importer.is_xisf_by_name(source_path):
+        if kind is FileKind.XISF:
             if self.export_xisf_as_fits:
                 self.copy_xisf_as_fits(source_path, output_file_path, file, custom_headers)
-                shutil.copystat(source_path, output_file_path)
+                self._copy_stat(source_path, output_file_path)
             else:
-                shutil.copy2(source_path, output_file_path)
+                _fast_copy(source_path, output_file_path, self.preserve_times)
         # FITS
-        elif Importer.is_fits_by_name(source_path):
-            if self.customize_fits_headers(custom_headers) or (is_compressed(source_path) and self.decompress):
+        elif kind is FileKind.FITS or kind is FileKind.FITS_COMPRESSED:
+            compressed = kind is FileKind.FITS_COMPRESSED
+            if self.customize_fits_headers(custom_headers) and not compressed:
+                # header-only change: copy the bytes, then patch the header without decoding the pixel data.
+                # The patch touches the file again, so times are only copied once, after it.
+                _fast_copy(source_path, output_file_path, preserve_times=False)
+                self.patch_fits_header(output_file_path, file, custom_headers)
+                self._copy_stat(source_path, output_file_path)
+            elif self.customize_fits_headers(custom_headers) or (compressed and self.decompress):
                 with fopen(source_path) as source_file:
                     self.copy_fits_data(source_file, output_file_path, file, custom_headers)
-                shutil.copystat(source_path, output_file_path)
+                self._copy_stat(source_path, output_file_path)
             else:
-                shutil.copy2(source_path, output_file_path)
+                _fast_copy(source_path, output_file_path, self.preserve_times)
+
+    def _copy_stat(self, source_path: str, output_file_path: str):
+        # times and permissions cost a few extra round-trips per file on network shares, they're optional
+        if self.preserve_times:
+            shutil.copystat(source_path, output_file_path)
 
     def copy_fits_data(self, source_fd, output_file_path: str, file: File, custom_headers: dict = None):
         custom_headers = custom_headers or {}
@@ -356,47 +485,40 @@ class ExportWorker(BackgroundLoaderBase):
                 repair_header(header)
 
                 self._copy_wcs(file, header)
-
-                for key, value in custom_headers.items():
-                    header[key] = value
+                apply_custom_headers(header, custom_headers)
 
                 hdu = fits.PrimaryHDU(data=data, header=header)
-                hdu.writeto(output_file_path, overwrite=True, output_verify='silentfix')
+                write_hdu(hdu, output_file_path)
         else:
             with open(output_file_path, "wb") as destination_file:
                 shutil.copyfileobj(source_fd, destination_file)
 
-    def _copy_wcs(self, file: File, header):
-        if self.override_platesolve and hasattr(file, 'filewcs'):
-            wcs_str = decompress(file.filewcs.wcs)
-            wcs_header = fits.Header.fromstring(wcs_str)
-            for key in wcs_header:
-                if not key.startswith('NAXIS'):
-                    header[key] = wcs_header[key]
-
-    def copy_xisf_as_fits(self, source_path: str, output_file_path: str, file: File, custom_headers: dict = None):
+    def patch_fits_header(self, output_file_path: str, file: File, custom_headers: dict = None):
+        """Apply WCS override and custom headers to an already copied FITS file, in place."""
         custom_headers = custom_headers or {}
-        from xisf import XISF
-        xisf = XISF(source_path)
-        metas = xisf.get_images_metadata()
-
-        for i, meta in enumerate(metas):
-            if "FITSKeywords" in meta:
-                header = header_from_xisf_dict(meta["FITSKeywords"])
-                image_data = xisf.read_image(i, 'channels_first')
-
-                self._copy_wcs(file, header)
+        with fits.open(output_file_path, mode='update') as hdul:
+            header = hdul[0].header
+            repair_header(header)
 
-                for key, value in custom_headers.items():
-                    header[key] = value
+            self._copy_wcs(file, header)
+            apply_custom_headers(header, custom_headers)
+            hdul.flush(output_verify='silentfix')
 
-                image_data = np.squeeze(image_data)
+    def _copy_wcs(self, file: File, header):
+        apply_wcs_text(header, self._wcs_text(file))
 
-                hdu = fits.PrimaryHDU(data=image_data, header=header)
-                hdu.writeto(output_file_path, overwrite=True, output_verify='silentfix')
-                return
+    def _wcs_text(self, file: File) -> bytes | None:
+        if self.override_platesolve and hasattr(file, 'filewcs'):
+            return decompress(file.filewcs.wcs)
+        return None
 
-        raise Exception(f"No suitable image with FITS keywords found in XISF file: {source_path}")
+    def copy_xisf_as_fits(self, source_path: str, output_file_path: str, file: File, custom_headers: dict = None):
+        args = (source_path, output_file_path, self._wcs_text(file), custom_headers or {})
+        if self._xisf_pool:
+            # decoding is CPU bound: run it in a worker process, this (copy) thread just waits for it
+            self._xisf_pool.submit(convert_xisf_to_fits, *args).result()
+        else:
+            convert_xisf_to_fits(*args)
 
     def cancel(self):
         """Cancel the export process."""
@@ -485,7 +607,7 @@ class ExportDialog(QDialog, Ui_ExportDialog):
         self.setupUi(self)
         self.setWindowFlags(self.windowFlags() | Qt.WindowMaximizeButtonHint)
         self.context = context
-        self.search_criteria = copy.deepcopy(search_criteria)
+        self.search_criteria = search_criteria.clone()
 
         # Materialize all files and split into lights vs. calibration preselect
         all_files = self._materialize_files(files)
@@ -534,7 +656,13 @@ class ExportDialog(QDialog, Ui_ExportDialog):
 
         self.buttonBox.accepted.connect(self.export_files)
         self.dryRunButton.clicked.connect(self.dry_run)
-        self.patternComboBox.editTextChanged.connect(self.update_preview)
+        # coalesce bursts of keystrokes into a single preview render
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(lambda: self.update_preview(None))
+        self._preview_pattern: tuple[str, string.Template, bool] | None = None  # last (text, template, valid)
+        self.patternComboBox.editTextChanged.connect(self._preview_timer.start)
         self.useRefCheckBox.stateChanged.connect(self.update_preview)
         self.useMasterCheckBox.stateChanged.connect(self._on_use_master_changed)
         self.sharedSessionCheckBox.stateChanged.connect(self._refresh_all_calib_labels)
@@ -546,14 +674,16 @@ class ExportDialog(QDialog, Ui_ExportDialog):
     def _materialize_files(self, files: Optional[List[File]]) -> List[File]:
         if files:
             return files
-        with self.context.database.bind_ctx([File, Image]):
-            query = (File
-                     .select(File, Image, FileWCS)
-                     .join_from(File, Image, JOIN.LEFT_OUTER)
-                     .join_from(File, FileWCS, JOIN.LEFT_OUTER)
-                     .order_by(File.root, File.path, File.name))
-            query = Image.apply_search_criteria(query, self.search_criteria)
-            return list(query)
+        # LibraryRoot is joined so full_filename() doesn't lazy-load the root once per file during the copy
+        query = (File
+                 .select(File, Image, FileWCS, LibraryRoot)
+                 .join_from(File, LibraryRoot)
+                 .join_from(File, Image, JOIN.LEFT_OUTER)
+                 .join_from(File, FileWCS, JOIN.LEFT_OUTER)
+                 .order_by(File.root, File.path, File.name))
+        query = Image.apply_search_criteria(query, self.search_criteria)
+        # iterator(): the rows are kept in the returned list, no need for peewee's result cache too
+        return list(query.iterator())
 
     def _partition_lights(self, files: List[File]) -> tuple:
         lights = []
@@ -794,7 +924,7 @@ class ExportDialog(QDialog, Ui_ExportDialog):
         dlg = HeadersDialog(self._calib_headers.get(row, ""), parent=self)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             text = dlg.get_text().strip()
-            bad_lines = [l.strip() for l in text.splitlines() if l.strip() and '=' not in l]
+            _, bad_lines = parse_custom_headers(text)
             if bad_lines:
                 QMessageBox.warning(
                     self, "Custom FITS Headers",
@@ -859,6 +989,7 @@ class ExportDialog(QDialog, Ui_ExportDialog):
         self.overridePlatesolveCheckBox.setChecked(settings.get_last_export_override_platesolve())
         self.useMasterCheckBox.setChecked(settings.get_last_export_use_master())
         self.sharedSessionCheckBox.setChecked(settings.get_last_export_shared_session())
+        self.preserveTimesCheckBox.setChecked(settings.get_last_export_preserve_times())
 
         patterns = settings.get_last_export_patterns()
         self.patternComboBox.clear()
@@ -875,6 +1006,7 @@ class ExportDialog(QDialog, Ui_ExportDialog):
         settings.set_last_export_override_platesolve(self.overridePlatesolveCheckBox.isChecked())
         settings.set_last_export_use_master(self.useMasterCheckBox.isChecked())
         settings.set_last_export_shared_session(self.sharedSessionCheckBox.isChecked())
+        settings.set_last_export_preserve_times(self.preserveTimesCheckBox.isChecked())
 
         pattern = self.patternComboBox.currentText()
         patterns = settings.get_last_export_patterns() or []
@@ -912,7 +1044,8 @@ class ExportDialog(QDialog, Ui_ExportDialog):
             self._build_file_headers_map(),
             project,
             shared_file_ids,
-            {f.rowid for f in self.light_files}
+            {f.rowid for f in self.light_files},
+            self.preserveTimesCheckBox.isChecked()
         )
 
         self.buttonBox.rejected.connect(self.cancel_export)
@@ -969,12 +1102,16 @@ class ExportDialog(QDialog, Ui_ExportDialog):
 
     def update_preview(self, ignored):
         text = self.patternComboBox.currentText()
-        tpl = string.Template(template=text)
-        self.buttonBox.button(QDialogButtonBox.StandardButton.Ok).setEnabled(tpl.is_valid())
+        if self._preview_pattern is None or self._preview_pattern[0] != text:
+            tpl = string.Template(template=text)
+            self._preview_pattern = (text, tpl, tpl.is_valid())
+        _, tpl, valid = self._preview_pattern
+        self.buttonBox.button(QDialogButtonBox.StandardButton.Ok).setEnabled(valid)
         if not self.first_file:
             return
         ref = self.search_criteria.reference_file if self.useRefCheckBox.isChecked() else None
         filename = template_filename_with_ref(self.first_file, ref, tpl, self.context.settings,
                                               self.decompressCheckBox.isChecked(),
-                                              self.exportXisfAsFitsCheckBox.isChecked())
+                                              self.exportXisfAsFitsCheckBox.isChecked(),
+                                              preview_mode=True)
         self.outputPreview.setText(filename)
@@ -1,7 +1,8 @@
-import astropy.units as u
+import functools
+from typing import NamedTuple
+
 import numpy as np
 from PySide6.QtWidgets import QWidget, QTableWidgetItem
-from astropy.coordinates import SkyCoord
 from astropy.io.fits import Header
 from astropy.wcs import WCS
 from astropy.wcs.utils import proj_plane_pixel_scales
@@ -28,20 +29,37 @@ class HeaderDialog(QWidget, Ui_HeaderDialog):
         wcs_content = wcs_header.tostring(sep="\n", endcard=False, padding=False) if wcs_header is not None else ""
         self.wcsHeaderTextEdit.setPlainText(wcs_content)
 
-        wcs_model = WCS(wcs_header)
         shape = get_shape_from_header(header, wcs_header)
-        results = analyze_wcs(wcs_model, shape)
+        results = analyze_wcs_header(wcs_header, shape)
         self.wcsSummary.setRowCount(1)
-        self.wcsSummary.setItem(0, 0, QTableWidgetItem(f"{results['arcsec_per_pixel'][0]:.2f}\"/px"))
-        self.wcsSummary.setItem(0, 1, QTableWidgetItem(f"{_format_ra(results['center'].ra.value)} "
-                                                       f"{_format_dec(results['center'].dec.value)}"))
-        self.wcsSummary.setItem(0, 2, QTableWidgetItem(f"{int(results['fov_arcmin'][0])}' x"
-                                                       f" {int(results['fov_arcmin'][1])}'"))
-        self.wcsSummary.setItem(0, 3, QTableWidgetItem(f"{results['rotation_deg']:.2f}°"))
+        self.wcsSummary.setItem(0, 0, QTableWidgetItem(f"{results.arcsec_per_pixel[0]:.2f}\"/px"))
+        self.wcsSummary.setItem(0, 1, QTableWidgetItem(f"{_format_ra(results.center_ra)} "
+                                                       f"{_format_dec(results.center_dec)}"))
+        self.wcsSummary.setItem(0, 2, QTableWidgetItem(f"{int(results.fov_arcmin[0])}' x"
+                                                       f" {int(results.fov_arcmin[1])}'"))
+        self.wcsSummary.setItem(0, 3, QTableWidgetItem(f"{results.rotation_deg:.2f}°"))
         self.wcsSummary.resizeColumnsToContents()
 
 
-def analyze_wcs(wcs, shape):
+class WcsSummary(NamedTuple):
+    arcsec_per_pixel: tuple[float, float]
+    center_ra: float  # degrees
+    center_dec: float
+    fov_arcmin: tuple[float, float]
+    rotation_deg: float
+
+
+def analyze_wcs_header(wcs_header: Header, shape) -> WcsSummary:
+    """analyze_wcs for a header, memoized on the header text: flipping between rows re-opens the same solutions."""
+    return _analyze_wcs_text(wcs_header.tostring(), tuple(shape))
+
+
+@functools.lru_cache(maxsize=128)
+def _analyze_wcs_text(wcs_text: str, shape: tuple) -> WcsSummary:
+    return analyze_wcs(WCS(Header.fromstring(wcs_text)), shape)
+
+
+def analyze_wcs(wcs, shape) -> WcsSummary:
     # Arcsec per pixel
     pixel_scales = proj_plane_pixel_scales(wcs)  # in degrees/pixel
     arcsec_per_pixel = pixel_scales * 3600  # convert to arcsec/pixel
@@ -52,7 +70,6 @@ def analyze_wcs(wcs, shape):
 
     # Center in world coordinates
     center_world = wcs.wcs_pix2world([center_pixel], 0)[0]  # [RA, Dec]
-    center_coord = SkyCoord(ra=center_world[0] * u.deg, dec=center_world[1] * u.deg)
 
     # Field of view (in arcminutes)
     fov_deg = pixel_scales * np.array([nx, ny])
@@ -63,12 +80,13 @@ def analyze_wcs(wcs, shape):
     rotation_rad = np.arctan2(cd[0, 1], cd[0, 0])
     rotation_deg = np.degrees(rotation_rad)
 
-    return {
-        'arcsec_per_pixel': arcsec_per_pixel,
-        'center': center_coord,
-        'fov_arcmin': fov_arcmin,
-        'rotation_deg': float(rotation_deg)
-    }
+    return WcsSummary(
+        arcsec_per_pixel=tuple(float(v) for v in arcsec_per_pixel),
+        center_ra=float(center_world[0]) % 360.0,
+        center_dec=float(center_world[1]),
+        fov_arcmin=tuple(float(v) for v in fov_arcmin),
+        rotation_deg=float(rotation_deg),
+    )
 
 
 def get_shape_from_header(header, wcs):
@@ -47,6 +47,7 @@ class ImageAnalysisDialog(QDialog):
         self._task.progress.connect(self._progress.setValue)
         self._task.total_found.connect(self._progress.setMaximum)
         self._task.message.connect(self._log.appendPlainText)
+        self._task.row_update.connect(self._on_row_update)
         self._task.finished.connect(self._on_finished)
         self._task.error.connect(self._on_error)
 
@@ -55,6 +56,10 @@ class ImageAnalysisDialog(QDialog):
         if self._task:
             self._task.start()
 
+    def _on_row_update(self, index: int, message: str):
+        self._progress.setValue(index)
+        self._log.appendPlainText(message)
+
     def _on_finished(self):
         task, self._task = self._task, None
         self._log.appendPlainText(f"\nDone: {len(task.analyzed_files)} file(s) analysed.")
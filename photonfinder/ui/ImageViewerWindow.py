@@ -1304,30 +1304,29 @@ class ImageViewerWindow(QMainWindow):
         if self._current_file is None or self._context is None:
             return
         from PySide6.QtCore import Qt
-        from photonfinder.models import CORE_MODELS, FitsHeader, FileWCS
+        from photonfinder.models import FitsHeader, FileWCS
         from photonfinder.filesystem import parse_FITS_header, decode_header_blob
         from photonfinder.core import decompress
         from .HeaderDialog import HeaderDialog
         file = self._current_file
-        with self._context.database.bind_ctx(CORE_MODELS):
-            try:
-                fits_header = FitsHeader.get(FitsHeader.file == file)
-                wcs = FileWCS.get_or_none(FileWCS.file == file)
-                header = decode_header_blob(fits_header.header)
-                wcs_header = None
-                if wcs:
-                    wcs_header = parse_FITS_header(decompress(wcs.wcs))
-                dialog = HeaderDialog(header, wcs_header, parent=self)
-                dialog.setAttribute(Qt.WA_DeleteOnClose)
-                dialog.setWindowFlags(Qt.Window)
-                dialog.show()
-            except FitsHeader.DoesNotExist:
-                QMessageBox.information(
-                    self, "No Cached Header", f"No cached header found for file: {file.name}"
-                )
-            except Exception as e:
-                logger.error(e, exc_info=True)
-                QMessageBox.critical(self, "Error", f"Error reading cached header: {str(e)}")
+        try:
+            fits_header = FitsHeader.get(FitsHeader.file == file)
+            wcs = FileWCS.get_or_none(FileWCS.file == file)
+            header = decode_header_blob(fits_header.header)
+            wcs_header = None
+            if wcs:
+                wcs_header = parse_FITS_header(decompress(wcs.wcs))
+            dialog = HeaderDialog(header, wcs_header, parent=self)
+            dialog.setAttribute(Qt.WA_DeleteOnClose)
+            dialog.setWindowFlags(Qt.Window)
+            dialog.show()
+        except FitsHeader.DoesNotExist:
+            QMessageBox.information(
+                self, "No Cached Header", f"No cached header found for file: {file.name}"
+            )
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            QMessageBox.critical(self, "Error", f"Error reading cached header: {str(e)}")
 
     # ------------------------------------------------------------------
     # Private: loading pipeline
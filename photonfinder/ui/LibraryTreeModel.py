@@ -145,6 +145,10 @@ class LibraryTreeModel(QAbstractItemModel):
         # Start async loading
         self.library_roots_loader.reload_library_roots()
 
+    def set_library_roots(self, library_roots):
+        """Show library roots that were already loaded, e.g. by a single query shared between panels."""
+        self._on_library_roots_reloaded(library_roots)
+
     def _on_library_roots_reloaded(self, library_roots):
         """Handle the library_roots_loaded signal."""
         # Get the "All libraries" node
@@ -42,6 +42,13 @@ class LogWindow(QDialog):
         Add a message to the log.
         """
         self.log_text.append(message)
+
+    def add_messages(self, messages):
+        """
+        Add several messages to the log at once.
+        """
+        if messages:
+            self.log_text.append("\n".join(messages))
     
     def clear_log(self):
         """
@@ -1,17 +1,21 @@
+import collections
 import logging
-import time
-from copy import deepcopy
+import queue
+import threading
+from dataclasses import replace
 from pathlib import Path
 from typing import List
 
-from PySide6.QtCore import QThread, Signal, QObject, QSize
+from PySide6.QtCore import QThreadPool, Signal, QObject, QSize, QTimer, QElapsedTimer
 from PySide6.QtGui import QIcon, QPalette, QAction, QDragEnterEvent, QDropEvent
 from PySide6.QtWidgets import *
+from astropy.coordinates import SkyCoord
 
-from photonfinder.core import ApplicationContext, StatusReporter, backup_database
-from photonfinder.filesystem import Importer, update_fits_header_cache, check_missing_header_cache
+from photonfinder.core import ApplicationContext, StatusReporter
+from photonfinder.filesystem import Importer, apply_changes, check_missing_header_cache
 from photonfinder.models import SearchCriteria, Project, File, ProjectFile, RootAndPath, Image, LibraryRoot
 from .AboutDialog import AboutDialog
+from .BackgroundLoader import LibraryRootsLoader, DatabaseBackupTask
 from .ImageViewerWindow import ImageViewerWindow
 from .LibraryRootDialog import LibraryRootDialog
 from .LibraryTreeModel import AllLibrariesNode, LibraryRootNode
@@ -26,8 +30,13 @@ import photonfinder.ui.generated.resources_rc
 from .session import SessionManager, Session
 
 
+# image type -> whether (find matching darks, find matching flats) applies to it
+_MATCHING_CALIBRATION = {"LIGHT": (True, True), "FLAT": (True, False)}
+
+
 class MainWindow(QMainWindow, Ui_MainWindow):
     tabs_changed = Signal(list)
+    tab_title_changed = Signal(object, str)  # panel, title
     projects_window: ProjectsWindow | None
 
     def __init__(self, app: QApplication, context: ApplicationContext, parent=None):
@@ -36,9 +45,20 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.context = context
         self.app = app
         self.session_manager = SessionManager(context.get_session_file())
+        self._session_save: threading.Thread | None = None
+        self._pending_sessions: List[Session] = []  # saved tabs not restored yet
+        self._search_panels: list[SearchPanel] | None = None  # tab order, see get_search_panels
+        self._search_panel_index: dict[int, int] | None = None  # id(panel) -> tab index
+        self._tabs_signature: tuple[int, ...] = ()  # panels last sent with tabs_changed
+        self.library_roots_loader = LibraryRootsLoader(context)
+        self.library_roots_loader.library_roots_loaded.connect(self._on_library_roots_loaded)
+        self.backup_task: DatabaseBackupTask | None = None
         self.scan_worker = None  # Initialize scan_worker attribute
+        self._scan_totals = [0, 0, 0]  # added, changed, removed during the running scan
         self.projects_window = None
         self.image_viewer: ImageViewerWindow | None = None
+        # selected files and their first sky coordinate, shared by the Project menu and its submenus while open
+        self._menu_selection_cache: tuple[List[File], SkyCoord | None] | None = None
 
         self.menuProject_Details.removeAction(self.actionLoading_2)
         self.menuSearch_Details.removeAction(self.actionLoading)
@@ -51,9 +71,13 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         size = QSize(24, 24)
         self.actionManage_Projects.setIcon(create_colored_svg_icon(":/res/stack.svg", size, text_color))
         self.action_New_Tab.setIcon(create_colored_svg_icon(":/res/window-plus.svg", size, text_color))
-        self.action_Manage_Libraries.setIcon(create_colored_svg_icon(":/res/hdd.svg", size, text_color))
-        self.actionOpen_File.setIcon(create_colored_svg_icon(":/res/card-image.svg", size, text_color))
-        self.action_Open_Database.setIcon(create_colored_svg_icon(":/res/database.svg", size, text_color))
+        # these actions only appear in menus, so their icons are rendered when the menu is first opened;
+        # the rest are on the main or search panel toolbars and are visible right away
+        self._pending_icons: dict[QMenu, list[tuple[QAction, str]]] = {
+            self.menu_File: [(self.action_Manage_Libraries, ":/res/hdd.svg"),
+                             (self.action_Open_Database, ":/res/database.svg")],
+            self.menu_Tools: [(self.actionOpen_File, ":/res/card-image.svg")],
+        }
         self.action_Export_Data.setIcon(create_colored_svg_icon(":/res/send-plus.svg", size, text_color))
         self.actionCatalog_Report.setIcon(create_colored_svg_icon(":/res/table.svg", size, text_color))
 
@@ -131,6 +155,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.actionFind_matching_flats.triggered.connect(self.find_matching_flats)
         self.action_About.triggered.connect(self.show_about_dialog)
         self.tabWidget.currentChanged.connect(self.on_tab_switch)
+        self.tabWidget.tabBar().tabMoved.connect(self._invalidate_search_panels)
         self.actionOpen_File.triggered.connect(self.open_selected_file)
         self.actionShow_location.triggered.connect(self.show_file_location)
         self.actionShow_Details.triggered.connect(self.show_file_details)
@@ -147,6 +172,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.menuAddToNearbyProject.aboutToShow.connect(self.populate_nearby_projects)
         self.menuAddToRecentProject.aboutToShow.connect(self.populate_recent_projects)
         self.menuProject.aboutToShow.connect(self.on_show_project_menu)
+        for menu in self._pending_icons:
+            menu.aboutToShow.connect(self._set_pending_icons)
+        self.menuProject.aboutToHide.connect(self._clear_menu_selection_cache)
         self.actionAddToNewProject.triggered.connect(self.on_add_to_project_action)
         self.dockWidget.visibilityChanged.connect(self.show_projects_window)
         self.action_filter_no_project.triggered.connect(self.add_no_project_filter)
@@ -155,7 +183,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def closeEvent(self, event):
         try:
-            self.save_session()
+            self.save_session(in_background=True)
             if self.mcp_controller is not None:
                 self.mcp_controller.stop()
         finally:
@@ -184,9 +212,21 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def restore_session(self):
         try:
-            sessions = self.session_manager.load_sessions()
-            for session in sessions:
-                panel = self.new_search_tab(session.criteria, hidden_columns=session.hidden_columns)
+            self._pending_sessions = list(self.session_manager.load_sessions())
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            self._pending_sessions = []
+        # the first tab is restored right away so there always is a current panel; the others are added one
+        # per event loop pass, so the window paints in between and only the visible tab runs its search
+        self._restore_next_session()
+
+    def _restore_next_session(self):
+        try:
+            if self._pending_sessions:
+                session = self._pending_sessions.pop(0)
+                first = len(self.get_search_panels()) == 0
+                panel = self.new_search_tab(session.criteria, hidden_columns=session.hidden_columns,
+                                            make_current=first)
                 if session.title_is_custom:
                     panel.set_custom_title(session.title)
                 else:
@@ -194,19 +234,26 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         except Exception as e:
             logging.error(e, exc_info=True)
         finally:
-            if len(self.get_search_panels()) == 0:
+            if self._pending_sessions:
+                QTimer.singleShot(0, self._restore_next_session)
+            elif len(self.get_search_panels()) == 0:
                 self.new_search_tab()
 
-    def save_session(self):
+    def save_session(self, in_background=False):
+        if self._session_save is not None and self._session_save.is_alive():
+            return  # a close already snapshotted the tabs and is writing them
         sessions = [Session(
-            criteria=panel.search_criteria,
+            criteria=panel.search_criteria.clone(),
             hidden_columns=panel.visibility_controller.save_visibility(),
             title=panel.title,
             title_is_custom=panel.title_is_custom
-        ) for panel in self.get_search_panels()]
-        self.session_manager.save_sessions(sessions)
+        ) for panel in self.get_search_panels()] + self._pending_sessions
+        if in_background:
+            self._session_save = self.session_manager.save_sessions_in_background(sessions)
+        else:
+            self.session_manager.save_sessions(sessions)
 
-    def new_search_tab(self, search_criteria=None, hidden_columns=None) -> SearchPanel:
+    def new_search_tab(self, search_criteria=None, hidden_columns=None, make_current=True) -> SearchPanel:
         if hidden_columns is None:
             current = self.get_current_search_panel()
             if current is not None:
@@ -215,12 +262,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 hidden_columns = ",".join(_BUILTIN_PRESETS["Standard"])
         panel = SearchPanel(self.context, parent=self.tabWidget, mainWindow=self)
         tab = self.tabWidget.addTab(panel, "Loading")
+        self._invalidate_search_panels()
         if search_criteria:
             panel.apply_search_criteria(search_criteria)
         if hidden_columns:
             panel.visibility_controller.load_visibility(hidden_columns)
-        self.tabWidget.setCurrentIndex(tab)
-        self.tabs_changed.emit(self.get_search_panels())
+        if make_current:
+            self.tabWidget.setCurrentIndex(tab)
+        self._emit_tabs_changed()
         return panel
 
     def dup_search_tab(self):
@@ -251,12 +300,26 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         widget = self.tabWidget.widget(index)
         assert isinstance(widget, SearchPanel)
         self.tabWidget.removeTab(index)
-        widget.destroy()
-        widget.deleteLater()
+        self._invalidate_search_panels()
+        widget.deleteLater()  # queued: the panel and its views are torn down once, by the event loop
         if self.tabWidget.count() == 0:
             self.new_search_tab()
         else:
-            self.tabs_changed.emit(self.get_search_panels())
+            self._emit_tabs_changed()
+
+    def _close_all_search_tabs(self):
+        """Remove every search tab without reopening one or notifying per tab; the caller opens the next tab,
+        which emits tabs_changed once."""
+        self._pending_sessions = []  # tabs still queued by restore_session belong to the old database
+        self.tabWidget.blockSignals(True)
+        try:
+            while self.tabWidget.count():
+                widget = self.tabWidget.widget(0)
+                self.tabWidget.removeTab(0)
+                widget.deleteLater()
+        finally:
+            self.tabWidget.blockSignals(False)
+            self._invalidate_search_panels()
 
     def manage_library_roots(self):
         """
@@ -335,11 +398,21 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.scan_worker = LibraryScanWorker(self.context, roots=roots)
 
         # Connect signals
+        self.scan_worker.change_list_ready.connect(self._scan_progress)
         self.scan_worker.finished.connect(self._scan_finished)
+        self._scan_totals = [0, 0, 0]
 
         # Start the worker thread
         self.scan_worker.start()
 
+    def _scan_progress(self, changes):
+        """Called for every chunk of changes the scan has stored."""
+        for i, files in enumerate((changes.new_files, changes.changed_files, changes.removed_files)):
+            self._scan_totals[i] += len(files)
+        added, changed, removed = self._scan_totals
+        self.context.status_reporter.update_status(
+            f"Scanning... {added} added, {changed} changed, {removed} removed so far", bulk=True)
+
     def _scan_finished(self):
         """Called when the scan is finished."""
         self.context.status_reporter.update_status("Library scan complete.")
@@ -357,19 +430,41 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         This should be called when library roots are changed.
         """
         logging.debug("Reloading library roots in all search panels")
-        for i in range(self.tabWidget.count()):
-            widget = self.tabWidget.widget(i)
-            if isinstance(widget, SearchPanel):
-                widget.library_tree_model.reload_library_roots()
+        # one query for all panels, see _on_library_roots_loaded
+        self.library_roots_loader.reload_library_roots()
+
+    def _on_library_roots_loaded(self, library_roots):
+        for panel in self.get_search_panels():
+            panel.library_tree_model.set_library_roots(library_roots)
 
     def get_search_panels(self) -> list[SearchPanel]:
-        return [self.tabWidget.widget(i) for i in range(self.tabWidget.count())]
+        if self._search_panels is None:
+            self._search_panels = [self.tabWidget.widget(i) for i in range(self.tabWidget.count())]
+        return self._search_panels
+
+    def _invalidate_search_panels(self):
+        """Drop the cached tab order; called whenever a tab is added, removed or moved."""
+        self._search_panels = None
+        self._search_panel_index = None
+
+    def _index_of_search_panel(self, panel) -> int:
+        if self._search_panel_index is None:
+            self._search_panel_index = {id(p): i for i, p in enumerate(self.get_search_panels())}
+        return self._search_panel_index.get(id(panel), -1)
 
     def set_tab_title(self, tab, title: str):
         tabs: QTabWidget = self.tabWidget
-        my_index = tabs.indexOf(tab)
+        my_index = self._index_of_search_panel(tab)
         tabs.setTabText(my_index, title)
-        self.tabs_changed.emit(self.get_search_panels())
+        self.tab_title_changed.emit(tab, title)
+
+    def _emit_tabs_changed(self):
+        """Emit tabs_changed, unless the same panels were already announced in the same order."""
+        panels = self.get_search_panels()
+        signature = tuple(id(panel) for panel in panels)
+        if signature != self._tabs_signature:
+            self._tabs_signature = signature
+            self.tabs_changed.emit(panels)
 
     def get_current_search_panel(self) -> SearchPanel:
         return self.tabWidget.currentWidget()
@@ -434,8 +529,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         log_window = LogWindow(self)
 
         # Add all log messages to the log window
-        for message in self.reporter.get_log_messages():
-            log_window.add_message(message)
+        log_window.add_messages(self.reporter.get_log_messages())
 
         # Show the log window
         log_window.exec()
@@ -450,44 +544,61 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def export_data(self):
         self.get_current_search_panel().export_data()
 
+    def _database_dir(self) -> str:
+        """Start directory for the database file dialogs: the folder of the open database, which is known to be
+        reachable, rather than the working directory, which the dialog would list first and may be a slow share."""
+        if self.context.database_path:
+            return str(Path(self.context.database_path).parent)
+        return ""
+
     def create_backup(self):
         if not self.context.database:
             QMessageBox.warning(self, "Backup Failed", "Database is not open.")
             return
+        if self.backup_task is not None:
+            QMessageBox.warning(self, "Backup Failed", "A backup is already in progress.")
+            return
 
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Database Backup", "",
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Database Backup", self._database_dir(),
                                                    "SQLite Database (*.db);;All Files (*)")
 
         if not file_path:
             return  # User cancelled
 
-        try:
-            backup_database(self.context.database, file_path)
-            self.context.status_reporter.update_status(f"Database backup created at {file_path}")
-            QMessageBox.information(self, "Backup Complete", f"Database backup created at {file_path}")
-        except Exception as e:
-            error_msg = f"Failed to create backup: {str(e)}"
-            logging.error(error_msg)
-            self.context.status_reporter.update_status(error_msg)
-            QMessageBox.critical(self, "Backup Failed", error_msg)
+        # copied on the thread pool; the pages already copied are reported through the status bar
+        self.backup_task = DatabaseBackupTask(self.context, file_path)
+        self.backup_task.finished.connect(self._backup_finished)
+        self.backup_task.error.connect(self._backup_failed)
+        self.context.status_reporter.update_status(f"Creating database backup at {file_path}...")
+        self.backup_task.start()
+
+    def _backup_finished(self):
+        file_path = self.backup_task.backup_path
+        self.backup_task = None
+        self.context.status_reporter.update_status(f"Database backup created at {file_path}")
+        QMessageBox.information(self, "Backup Complete", f"Database backup created at {file_path}")
+
+    def _backup_failed(self, error: str):
+        self.backup_task = None
+        error_msg = f"Failed to create backup: {error}"
+        logging.error(error_msg)
+        self.context.status_reporter.update_status(error_msg)
+        QMessageBox.critical(self, "Backup Failed", error_msg)
 
     def create_database(self):
 
         file_path, _ = QFileDialog.getSaveFileName(self, "Create Database",
-                                                   "", "SQLite Database (*.db);;All Files (*)")
+                                                   self._database_dir(), "SQLite Database (*.db);;All Files (*)")
 
         if not file_path:
             return  # User cancelled
 
         try:
-            # close all tabs
-            for i in range(self.tabWidget.count()):
-                self.close_search_tab(i)
+            self._close_all_search_tabs()
             self.context.switch_database(file_path)
             # open new tab
             self.new_search_tab()
             self.context.status_reporter.update_status(f"Database created and opened at {file_path}")
-            self.reload_library_roots_in_all_panels()
 
         except Exception as e:
             error_msg = f"Failed to create database: {str(e)}"
@@ -504,7 +615,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Open Database",
-            "",
+            self._database_dir(),
             "SQLite Database (*.db);;All Files (*)"
         )
 
@@ -512,15 +623,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             return  # User cancelled
 
         try:
-            # close all tabs
-            for i in range(self.tabWidget.count()):
-                self.close_search_tab(i)
+            self._close_all_search_tabs()
             self.context.switch_database(file_path)
             # open new tab
             self.new_search_tab()
 
             self.context.status_reporter.update_status(f"Database opened at {file_path}")
-            self.reload_library_roots_in_all_panels()
         except Exception as e:
             error_msg = f"Failed to open database: {str(e)}"
             logging.error(error_msg)
@@ -535,6 +643,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         dark_criteria = SearchCriteria.find_dark(selected_image)
         panel = SearchPanel(self.context, parent=self.tabWidget, mainWindow=self)
         tab = self.tabWidget.addTab(panel, "Loading")
+        self._invalidate_search_panels()
         panel.apply_search_criteria(dark_criteria)
         self.tabWidget.setCurrentIndex(tab)
 
@@ -546,23 +655,28 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         flat_criteria = SearchCriteria.find_flat(selected_image)
         panel = SearchPanel(self.context, parent=self.tabWidget, mainWindow=self)
         tab = self.tabWidget.addTab(panel, "Loading")
+        self._invalidate_search_panels()
         panel.apply_search_criteria(flat_criteria)
         self.tabWidget.setCurrentIndex(tab)
 
     def on_tab_switch(self):
         self.enable_actions_for_current_tab()
 
-    def open_selected_file(self):
-        """Open the selected file using the associated application."""
+    def _panel_and_first_selected_row(self):
+        """The current search panel and the index of its first selected row, or (None, None)."""
         current_panel = self.get_current_search_panel()
         if not current_panel:
-            return
-        # Get the selected row
+            return None, None
         selected_rows = current_panel.dataView.selectionModel().selectedRows()
         if not selected_rows:
-            return
-        # Open the file at the selected row
-        current_panel.open_file(selected_rows[0])
+            return None, None
+        return current_panel, selected_rows[0]
+
+    def open_selected_file(self):
+        """Open the selected file using the associated application."""
+        current_panel, row = self._panel_and_first_selected_row()
+        if current_panel:
+            current_panel.open_file(row)
 
     def view_image(self, file, panel=None, row: int = -1, rows: list[int] | None = None,
                    annotate: bool = False, annotation_catalog: str | None = None,
@@ -583,36 +697,20 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def show_file_location(self):
         """Open the file explorer showing the directory containing the selected file."""
-        current_panel = self.get_current_search_panel()
-        if not current_panel:
-            return
-        # Get the selected row
-        selected_rows = current_panel.dataView.selectionModel().selectedRows()
-        if not selected_rows:
-            return
-        # Show the file location
-        current_panel.show_file_location(selected_rows[0])
+        current_panel, row = self._panel_and_first_selected_row()
+        if current_panel:
+            current_panel.show_file_location(row)
 
     def show_file_details(self):
-        current_panel = self.get_current_search_panel()
-        if not current_panel:
-            return
-        selected_rows = current_panel.dataView.selectionModel().selectedRows()
-        if not selected_rows:
-            return
-        current_panel.show_file_details(selected_rows[0])
+        current_panel, row = self._panel_and_first_selected_row()
+        if current_panel:
+            current_panel.show_file_details(row)
 
     def select_path_in_tree(self):
         """Select the path of the selected file in the tree view."""
-        current_panel = self.get_current_search_panel()
-        if not current_panel:
-            return
-        # Get the selected row
-        selected_rows = current_panel.dataView.selectionModel().selectedRows()
-        if not selected_rows:
-            return
-        # Select the path in the tree
-        current_panel.select_path_in_tree(selected_rows[0])
+        current_panel, row = self._panel_and_first_selected_row()
+        if current_panel:
+            current_panel.select_path_in_tree(row)
 
     def plate_solve_files(self):
         self.get_current_search_panel().plate_solve_files()
@@ -643,8 +741,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         current_panel = self.get_current_search_panel()
         if not current_panel:
             return
-        file = current_panel.get_selected_file()
-        selected_image = file.image if file and hasattr(file, 'image') and file.image else None
+        selected_image = current_panel.get_selected_image()
         has_selection = selected_image is not None
         self.actionOpen_File.setEnabled(has_selection)
         self.actionShow_location.setEnabled(has_selection)
@@ -653,29 +750,30 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         if selected_image:
             current_type = selected_image.image_type
-            self.actionFind_matching_darks.setEnabled(current_type == "LIGHT" or current_type == "FLAT")
-            self.actionFind_matching_flats.setEnabled(current_type == "LIGHT")
+            darks_enabled, flats_enabled = _MATCHING_CALIBRATION.get(current_type, (False, False))
+            self.actionFind_matching_darks.setEnabled(darks_enabled)
+            self.actionFind_matching_flats.setEnabled(flats_enabled)
             is_light = not current_type or "LIGHT" in current_type
             self.actionPlate_solve_files.setEnabled(is_light)
 
-        self.actionExposure.setChecked(AdvancedFilter.EXPOSURE in current_panel.advanced_options)
-        self.actionCoordinates.setChecked(AdvancedFilter.COORDINATES in current_panel.advanced_options)
-        self.actionDate.setChecked(AdvancedFilter.DATETIME in current_panel.advanced_options)
-        self.actionTelescope.setChecked(AdvancedFilter.TELESCOPE in current_panel.advanced_options)
-        self.actionBinning.setChecked(AdvancedFilter.BINNING in current_panel.advanced_options)
-        self.actionGain.setChecked(AdvancedFilter.GAIN in current_panel.advanced_options)
-        self.actionTemperature.setChecked(AdvancedFilter.TEMPERATURE in current_panel.advanced_options)
-        self.actionPlateSolved.setChecked(AdvancedFilter.PLATE_SOLVED in current_panel.advanced_options)
-        self.actionImageSize.setChecked(AdvancedFilter.IMAGE_SIZE in current_panel.advanced_options)
-        self.actionPlateScale.setChecked(AdvancedFilter.PLATE_SCALE in current_panel.advanced_options)
-        self.actionImageQuality.setChecked(AdvancedFilter.IMAGE_QUALITY in current_panel.advanced_options)
+        options = current_panel.advanced_options
+        self.actionExposure.setChecked(AdvancedFilter.EXPOSURE in options)
+        self.actionCoordinates.setChecked(AdvancedFilter.COORDINATES in options)
+        self.actionDate.setChecked(AdvancedFilter.DATETIME in options)
+        self.actionTelescope.setChecked(AdvancedFilter.TELESCOPE in options)
+        self.actionBinning.setChecked(AdvancedFilter.BINNING in options)
+        self.actionGain.setChecked(AdvancedFilter.GAIN in options)
+        self.actionTemperature.setChecked(AdvancedFilter.TEMPERATURE in options)
+        self.actionPlateSolved.setChecked(AdvancedFilter.PLATE_SOLVED in options)
+        self.actionImageSize.setChecked(AdvancedFilter.IMAGE_SIZE in options)
+        self.actionPlateScale.setChecked(AdvancedFilter.PLATE_SCALE in options)
+        self.actionImageQuality.setChecked(AdvancedFilter.IMAGE_QUALITY in options)
 
     def add_selection_to_project(self, project: Project):
         edit_dialog = ProjectEditDialog(self.context, project=project, parent=self)
         selection = self.get_current_search_panel().get_selected_files()
         files_to_add = File.remove_already_mapped(project, selection)
-        for file in files_to_add:
-            edit_dialog.add_file(ProjectFile(project=project, file=file))
+        edit_dialog.add_project_files(ProjectFile(project=project, file=file) for file in files_to_add)
         edit_dialog.show()
         edit_dialog.refresh_table()
 
@@ -685,14 +783,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         root_and_path = root_and_paths[0]
         project = Project(name=root_and_path.path)
         edit_dialog = ProjectEditDialog(self.context, project=project, parent=self)
-        temp_criteria = deepcopy(self.get_current_search_panel().search_criteria)
-        temp_criteria.paths = [root_and_path]
+        temp_criteria = replace(self.get_current_search_panel().search_criteria, paths=[root_and_path])
         query = (File.select(File, LibraryRoot, Image)
                  .join_from(File, LibraryRoot)
                  .join_from(File, Image))
         query = Image.apply_search_criteria(query, temp_criteria)
-        for file in list(query.execute()):
-            edit_dialog.add_file(ProjectFile(project=project, file=file))
+        edit_dialog.add_project_files(ProjectFile(project=project, file=file) for file in query.execute())
         edit_dialog.show()
         edit_dialog.refresh_table()
 
@@ -709,9 +805,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def populate_nearby_projects(self):
         self.menuAddToNearbyProject.clear()
-        files = self.get_current_search_panel().get_selected_files()
-        coord = next((coord for f in files if hasattr(f, 'image') and
-                      f.image and (coord := f.image.get_sky_coord()) is not None), None)
+        _, coord = self._menu_selection()
         projects = Project.find_nearby(coord)
         if projects:
             for project in projects:
@@ -726,14 +820,34 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         project = action.data() if action.data() else Project()
         self.add_selection_to_project(project)
 
+    def _set_pending_icons(self):
+        menu = self.sender()
+        pending = self._pending_icons.pop(menu, None)
+        if not pending:
+            return
+        menu.aboutToShow.disconnect(self._set_pending_icons)
+        text_color = self.palette().color(QPalette.WindowText)
+        size = QSize(24, 24)
+        for action, svg_path in pending:
+            action.setIcon(create_colored_svg_icon(svg_path, size, text_color))
+
+    def _menu_selection(self) -> tuple[List[File], SkyCoord | None]:
+        if self._menu_selection_cache is None:
+            files = self.get_current_search_panel().get_selected_files()
+            coord = next((coord for f in files if hasattr(f, 'image') and
+                          f.image and (coord := f.image.get_sky_coord()) is not None), None)
+            self._menu_selection_cache = (files, coord)
+        return self._menu_selection_cache
+
+    def _clear_menu_selection_cache(self):
+        self._menu_selection_cache = None
+
     def on_show_project_menu(self):
-        current_panel = self.get_current_search_panel()
-        files = current_panel.get_selected_files()
+        self._clear_menu_selection_cache()
+        files, selection_coord = self._menu_selection()
         has_selection = files is not None and len(files) > 0
         self.menuAddToRecentProject.setEnabled(has_selection)
         self.actionAddToNewProject.setEnabled(has_selection)
-        selection_coord = next((coord for f in files if hasattr(f, 'image') and
-                                f.image and (coord := f.image.get_sky_coord()) is not None), None)
         self.menuAddToNearbyProject.setEnabled(has_selection and selection_coord is not None)
 
     def populate_search_details(self):
@@ -748,33 +862,66 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             controller.build_menu(self.menuProject_Details)
 
 
+LOG_HISTORY_SIZE = 10000
+
+
 class UIStatusReporter(StatusReporter, QObject):
     on_message = Signal(str)
+    _message_posted = Signal()
 
     def __init__(self):
         super().__init__()
-        self.last_update_time = 0
-        self.log_messages = []
+        self._last_update = QElapsedTimer()  # monotonic, invalid until the first message
+        self.log_messages = collections.deque(maxlen=LOG_HISTORY_SIZE)
+        # Only the latest message is shown, at most once per interval. The timer lives on the GUI
+        # thread; workers wake it through a signal only when no message was pending yet.
+        self._pending: str | None = None
+        self._pending_lock = threading.Lock()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(100)
+        self._flush_timer.timeout.connect(self._flush)
+        self._message_posted.connect(self._start_flush_timer)
 
     def update_status(self, message: str, bulk=False) -> None:
-        current_time = time.time()
-        if bulk and (current_time - self.last_update_time) < 1:
+        if bulk and self._last_update.isValid() and not self._last_update.hasExpired(1000):
             return
-        self.last_update_time = current_time
-        self.on_message.emit(message)
+        self._last_update.start()
 
         # Store non-bulk messages for the log window
         if not bulk and message:
             self.log_messages.append(message)
 
+        with self._pending_lock:
+            was_idle = self._pending is None
+            self._pending = message
+        if was_idle:
+            self._message_posted.emit()
+
+    def _start_flush_timer(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        with self._pending_lock:
+            message, self._pending = self._pending, None
+        if message is not None:
+            self.on_message.emit(message)
+
     def get_log_messages(self):
-        """Return the list of log messages."""
-        return self.log_messages
+        """Return a snapshot of the most recent log messages."""
+        # list() copies the deque in one step, so workers appending meanwhile can't break iteration
+        return list(self.log_messages)
 
 
-class LibraryScanWorker(QThread):
-    """Worker thread for scanning libraries."""
+_SCAN_DONE = object()  # end of a walker's share of the scan, from the directory walk to the storing loop
+_SCAN_WALKERS = 4  # libraries walked concurrently
+
+
+class LibraryScanWorker(QObject):
+    """Scans libraries on a thread of the global pool."""
     change_list_ready = Signal(object)  # Signal emitted when a change list is ready
+    finished = Signal()
 
     def __init__(self, context, files: List[str] = None, roots: List[LibraryRoot] = None):
         super().__init__()
@@ -785,23 +932,81 @@ class LibraryScanWorker(QThread):
                                  context.settings.get_bad_file_patterns(),
                                  context.settings.get_bad_dir_patterns())
 
+    def start(self):
+        QThreadPool.globalInstance().start(self.run)
+
     def run(self):
-        if self.files:
-            self.import_files()
-        else:
-            self.import_roots()
+        try:
+            # pool threads outlive the scan, so hand the connection back rather than keeping it thread-local
+            with self.context.database.connection_context():
+                if self.files:
+                    self.import_files()
+                else:
+                    self.import_roots()
+        except Exception as e:
+            logging.error(f"Error scanning libraries: {e}", exc_info=True)
+        finally:
+            self.finished.emit()
 
     def import_roots(self):
-        for changes_per_library in self.importer.import_roots(self.roots):
-            self.context.status_reporter.update_status(
-                f"Files removed {len(changes_per_library.removed_files)} " +
-                f"added {len(changes_per_library.new_files)} " +
-                f"changed {len(changes_per_library.changed_files)}")
-            changes_per_library.apply_all()
-            update_fits_header_cache(changes_per_library, self.context.status_reporter, self.context.settings)
-        check_missing_header_cache(self.context.status_reporter, self.context.settings)
+        # Each library is walked on its own thread (up to _SCAN_WALKERS at once) and hands over chunks of a few
+        # hundred files, so the filesystem latency of the libraries overlaps with each other and with storing
+        # the previous chunk and reading its headers here. Storing stays on this one thread: SQLite has a
+        # single writer anyway.
+        roots = self.roots or list(LibraryRoot.select())
+        pending_roots = queue.Queue()
+        for root in roots:
+            pending_roots.put(root)
+        chunks = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        walkers = [threading.Thread(target=self._scan_roots, args=(pending_roots, chunks, stop),
+                                    name=f"library-scan-{i}", daemon=True)
+                   for i in range(max(1, min(_SCAN_WALKERS, len(roots))))]
+        for walker in walkers:
+            walker.start()
+        try:
+            running = len(walkers)
+            while running:
+                changes = chunks.get()
+                if changes is _SCAN_DONE:
+                    running -= 1
+                    continue
+                self.context.status_reporter.update_status(
+                    f"Files removed {len(changes.removed_files)} " +
+                    f"added {len(changes.new_files)} " +
+                    f"changed {len(changes.changed_files)}")
+                apply_changes(changes, self.context.status_reporter, self.context.settings)
+                self.change_list_ready.emit(changes)
+        finally:
+            stop.set()
+            # unblock walkers waiting on a full queue if we bailed out early
+            while any(walker.is_alive() for walker in walkers):
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        self.context.status_reporter.update_status("done.")
+        check_missing_header_cache(self.context.status_reporter, self.context.settings,
+                                   self.context.unreadable_header_files)
+
+    def _scan_roots(self, pending_roots: queue.Queue, chunks: queue.Queue, stop: threading.Event):
+        try:
+            # a pooled connection of its own for the lookups of the walk, returned when done
+            with self.context.database.connection_context():
+                while not stop.is_set():
+                    try:
+                        root = pending_roots.get_nowait()
+                    except queue.Empty:
+                        break
+                    for changes in self.importer.import_root(root):
+                        if stop.is_set():
+                            break
+                        chunks.put(changes)
+        except Exception as e:
+            logging.error(f"Error scanning libraries: {e}", exc_info=True)
+        finally:
+            chunks.put(_SCAN_DONE)
 
     def import_files(self):
         changes = self.importer.import_selection(self.files)
-        changes.apply_all()
-        update_fits_header_cache(changes, self.context.status_reporter, self.context.settings)
+        apply_changes(changes, self.context.status_reporter, self.context.settings)
@@ -1,154 +1,289 @@
+import bisect
 import csv
+import logging
+import os
 import sys
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, List, Tuple
 
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QDialog, QListWidgetItem, QMessageBox, QDialogButtonBox, QFileDialog
 from astropy.io.fits import Header
-from peewee import JOIN
+from peewee import JOIN, ForeignKeyField, chunked
 
 from photonfinder.core import ApplicationContext, decompress
-from photonfinder.filesystem import decode_header_blob
-from photonfinder.models import SearchCriteria, File, Image, FitsHeader, FileWCS
+from photonfinder.filesystem import decode_header_bytes, fits_header_values
+from photonfinder.models import SearchCriteria, File, Image, FitsHeader, FileWCS, LibraryRoot
 from photonfinder.platesolver import SolverBase
 from photonfinder.ui.BackgroundLoader import FileProcessingTask
 from photonfinder.ui.generated.MetadataReportDialog_ui import Ui_MetadataReportDialog
 
 
+_REPORT_WRITE_BUFFER = 1024 * 1024
+_REPORT_ROW_BATCH = 1024  # rows handed to csv.writer.writerows at once
+
+
+def _is_plain_keyword(name: str) -> bool:
+    """Whether a FITS keyword can be looked up in the dict of fits_header_values."""
+    # fits_header_values matches raw ASCII keyword bytes: anything else goes to the astropy Header
+    return (0 < len(name) <= 8 and name.isascii() and ' ' not in name
+            and name.upper() not in ('COMMENT', 'HISTORY'))
+
+
+class _StreamedQuery:
+    """Rows of a query iterated once without caching them, sized by a COUNT(*)."""
+
+    def __init__(self, query):
+        self.query = query
+        self.count = query.count()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.query.iterator())
+
+
 class MetadataReportTask(FileProcessingTask):
     export_format: str
     output_filename: str
     field_list: List[Tuple[str, str]]
+    _need_fits: bool = False
+    _need_wcs: bool = False
+    _plain_fits_fields: bool = False
+    _plain_wcs_fields: bool = False
+    _fits_keywords: set = frozenset()
+    _wcs_keywords: set = frozenset()
 
     def start(self, output_filename: str = None, field_list: List[Tuple[str, str]] = None, export_format: str = 'csv'):
         self.export_format = export_format
         self.field_list = field_list
         self.output_filename = output_filename
+        # which headers the query joins and every file decodes, see _prepare_headers
+        self._need_fits = any(value == "fits" for _, value in field_list)
+        self._need_wcs = any(value == "platesolving" for _, value in field_list)
+        # plain keywords can be read without building an astropy Header, see fits_header_values
+        self._plain_fits_fields = all(_is_plain_keyword(name) for name, value in field_list if value == "fits")
+        self._plain_wcs_fields = all(_is_plain_keyword(name) for name, value in field_list if value == "platesolving")
+        self._fits_keywords = {name.upper() for name, value in field_list if value == "fits"}
+        self._wcs_keywords = {name.upper() for name, value in field_list if value == "platesolving"}
         super().start()
 
     def get_tables(self) -> List:
         tables = super().get_tables()
-        if any(value == "fits" for _, value in self.field_list):
+        if self._need_fits:
             tables.append(FitsHeader)
-        if any(value == "platesolving" for _, value in self.field_list):
+        if self._need_wcs:
             tables.append(FileWCS)
         return tables
 
     def create_query(self):
         query = super().create_query()
-        if any(value == "fits" for _, value in self.field_list):
+        if self._need_fits:
             query = query.join_from(File, FitsHeader, JOIN.LEFT_OUTER)
-        if any(value == "platesolving" for _, value in self.field_list):
+        if self._need_wcs:
             query = query.join_from(File, FileWCS, JOIN.LEFT_OUTER)
         return query
 
     def _process_files(self):
-        with open(self.output_filename, 'w') as f:
+        # newline='' as the csv module expects; a large buffer turns the per-row writes into few big ones
+        with open(self.output_filename, 'w', newline='', buffering=_REPORT_WRITE_BUFFER) as f:
+            self._output = f
             self.writer = csv.writer(f, dialect=csv.excel_tab if self.export_format == 'tsv' else csv.excel)
             self.writer.writerow(map(lambda tup: tup[0], self.field_list))
-            super()._process_files()
+            self._rows = []
+            column_plan = None if self.files else self._compile_column_plan(self.field_list)
+            if column_plan is not None:
+                self._export_columns(*column_plan)
+            else:
+                self._plan = self._compile_plan(self.field_list)
+                super()._process_files()
+
+    def _export_columns(self, columns: List, getters: List[Callable[[tuple], object]]):
+        """Export straight from selected columns as tuples, without building File and Image objects."""
+        try:
+            self.total_found.emit(0)  # busy indicator while the query runs
+            query = self.create_query().select(*columns).tuples()
+            self.total = query.count()
+            self.total_found.emit(self.total)
+            written = 0
+            for batch in chunked(query.iterator(), _REPORT_ROW_BATCH):
+                if self.cancelled:
+                    break
+                self.writer.writerows([["" if (value := getter(row)) is None else str(value) for getter in getters]
+                                       for row in batch])
+                written += len(batch)
+                self.progress.emit(written - 1)
+            self._files_processed()
+            self.finished.emit()
+        except Exception as e:
+            logging.error(f"Error processing files: {e}", exc_info=True)
+            self.error.emit(str(e))
+
+    def _load_files(self):
+        """The explicit file selection, or the query streamed: a COUNT for the progress bar, then the rows as they
+        are read, so memory stays flat and the first rows are written right away."""
+        if self.files:
+            return self.files
+        self.total_found.emit(0)  # busy indicator while the count runs
+        return _StreamedQuery(self.create_query())
 
     def _process_file(self, file, index):
         super()._process_file(file, index)
-        list_of_values = self.file_to_list_of_values(file, self.field_list)
-        self.writer.writerow(list_of_values)
+        self._prepare_headers(file)
+        self._rows.append(self.file_to_list_of_values(file, self._plan))
+        if len(self._rows) >= _REPORT_ROW_BATCH:
+            self._write_rows()
+
+    def _files_processed(self):
+        self._write_rows()
+        # finished follows: the report must be on disk by then, and a failing write reported as an error
+        self._output.flush()
 
-    def file_to_list_of_values(self, file: File, field_list: List[Tuple[str, str]]) -> List[str]:
+    def _write_rows(self):
+        self.writer.writerows(self._rows)
+        self._rows.clear()
+
+    def file_to_list_of_values(self, file: File, plan: List[Tuple[str, str, Callable[[File], object]]]) -> List[str]:
         """
-        Process a file and extract metadata values based on the field list.
+        Process a file and extract metadata values based on a plan from _compile_plan.
 
         Args:
             file: File model object with eagerly loaded FitsHeader, Image and FileWCS tables
-            field_list: List of tuples (field_name, source_type) where source_type is 
-                       'photonfinder', 'fits', or 'platesolving'
+            plan: List of tuples (field_name, source_type, getter), one per report column
 
         Returns:
             List of string values corresponding to the requested fields
         """
         result = []
 
-        for field_name, source_type in field_list:
-            value = self._extract_field_value(file, field_name, source_type)
+        for field_name, source_type, getter in plan:
+            try:
+                value = getter(file)
+            except Exception as e:
+                # Log error but don't fail the entire process
+                logging.warning(f"Error extracting field {field_name} from {source_type}: {e}")
+                value = None
             result.append(str(value) if value is not None else "")
 
         return result
 
-    def _extract_field_value(self, file: File, field_name: str, source_type: str):
-        """Extract a single field value from the file based on source type."""
-        try:
-            if source_type == "photonfinder":
-                return self._extract_photonfinder_field(file, field_name)
-            elif source_type == "fits":
-                return self._extract_fits_field(file, field_name)
-            elif source_type == "platesolving":
-                return self._extract_platesolving_field(file, field_name)
+    def _compile_plan(self, field_list: List[Tuple[str, str]]) -> List[Tuple[str, str, Callable[[File], object]]]:
+        """Resolve the source type and prefix of every field once, into a getter that is called per file.
+
+        Args:
+            field_list: List of tuples (field_name, source_type) where source_type is
+                       'photonfinder', 'fits', or 'platesolving'
+        """
+        return [(field_name, source_type, self._field_getter(field_name, source_type))
+                for field_name, source_type in field_list]
+
+    def _compile_column_plan(self, field_list: List[Tuple[str, str]]) \
+            -> Tuple[List, List[Callable[[tuple], object]]] | None:
+        """The columns to select and a getter per field reading them from a result tuple, when every field is a
+        column of File or Image (or File.full_filename); None when the export needs the model objects."""
+        columns, getters = [], []
+        for field_name, source_type in field_list:
+            model_name, _, attr_name = field_name.partition(".")
+            model = {"File": File, "Image": Image}.get(model_name)
+            field = model._meta.fields.get(attr_name) if model else None
+            index = len(columns)
+            if source_type != "photonfinder":
+                return None
+            elif field_name == "File.full_filename":
+                columns += [LibraryRoot.path, File.path, File.name]
+                getters.append(lambda row, i=index: str(Path(os.path.join(str(row[i]), str(row[i + 1]),
+                                                                           str(row[i + 2])))))
+            elif field is not None and not isinstance(field, ForeignKeyField):
+                columns.append(field)
+                getters.append(itemgetter(index))
             else:
                 return None
-        except Exception as e:
-            # Log error but don't fail the entire process
-            import logging
-            logging.warning(f"Error extracting field {field_name} from {source_type}: {e}")
-            return None
+        return columns, getters
+
+    def _field_getter(self, field_name: str, source_type: str) -> Callable[[File], object]:
+        if source_type == "photonfinder":
+            return self._photonfinder_getter(field_name)
+        elif source_type == "fits":
+            keyword = field_name.upper() if _is_plain_keyword(field_name) else field_name
+            return lambda file: self._extract_fits_field(file, keyword)
+        elif source_type == "platesolving":
+            keyword = field_name.upper() if _is_plain_keyword(field_name) else field_name
+            return lambda file: self._extract_platesolving_field(file, keyword)
+        else:
+            return lambda file: None
 
-    def _extract_photonfinder_field(self, file: File, field_name: str):
-        """Extract field from File or Image model."""
+    @staticmethod
+    def _photonfinder_getter(field_name: str) -> Callable[[File], object]:
+        """Getter for a field of the File or Image model."""
         if field_name.startswith("File."):
             attr_name = field_name[5:]  # Remove "File." prefix
             if attr_name == "full_filename":
-                return str(Path(file.full_filename()))
+                return lambda file: str(Path(file.full_filename()))
             else:
-                return getattr(file, attr_name, None)
+                return lambda file: getattr(file, attr_name, None)
         elif field_name.startswith("Image."):
             attr_name = field_name[6:]  # Remove "Image." prefix
-            if hasattr(file, 'image') and file.image:
-                return getattr(file.image, attr_name, None)
-            else:
-                return None
+
+            def get_image_field(file):
+                image = getattr(file, 'image', None)
+                return getattr(image, attr_name, None) if image else None
+            return get_image_field
         else:
             # Handle legacy format without prefix
-            if hasattr(file, field_name):
-                return getattr(file, field_name, None)
-            elif hasattr(file, 'image') and file.image and hasattr(file.image, field_name):
-                return getattr(file.image, field_name, None)
-            else:
-                return None
-
-    def _extract_fits_field(self, file: File, field_name: str):
-        """Extract field from FITS header."""
+            def get_legacy_field(file):
+                if hasattr(file, field_name):
+                    return getattr(file, field_name, None)
+                image = getattr(file, 'image', None)
+                return getattr(image, field_name, None) if image else None
+            return get_legacy_field
+
+    def _prepare_headers(self, file: File):
+        """Decode the FITS header and WCS of the file once, for all the columns that read them."""
+        if self._need_fits:
+            file.header_obj = self._decode_fits_header(file)
+        if self._need_wcs:
+            file.filewcs_obj = self._decode_wcs(file)
+
+    def _decode_fits_header(self, file: File) -> Header | dict | None:
         try:
-            if hasattr(file, 'header_obj') and file.header_obj:
-                header = file.header_obj
-            else:
-                if hasattr(file, 'fitsheader') and file.fitsheader:
-                    header = decode_header_blob(file.fitsheader.header)
-                    file.header_obj = header
-                else:
-                    header = None
-            return header.get(field_name, None) if header else None
+            if hasattr(file, 'fitsheader') and file.fitsheader:
+                # decompressed once: the keyword dict and the full Header are both parsed from these bytes
+                raw = decompress(file.fitsheader.header)
+                if self._plain_fits_fields and not raw.startswith(b'{'):
+                    values = fits_header_values(raw, self._fits_keywords)
+                    if values is not None:
+                        return values
+                return decode_header_bytes(raw)
         except Exception as e:
-            import logging
-            logging.warning(f"Error parsing FITS header for field {field_name}: {e}", exc_info=True)
-            return None
+            logging.warning(f"Error parsing FITS header of {file.name}: {e}", exc_info=True)
+        return None
 
-    def _extract_platesolving_field(self, file: File, field_name: str):
-        """Extract field from WCS data."""
+    def _decode_wcs(self, file: File) -> Header | dict | None:
         try:
-            if hasattr(file, 'filewcs_obj') and file.filewcs_obj:
-                header = file.filewcs_obj
-            else:
-                if hasattr(file, 'filewcs') and file.filewcs:
-                    # Decompress the WCS data and parse it as FITS header
-                    wcs_data = decompress(file.filewcs.wcs)
-                    header = Header.fromstring(wcs_data.decode('utf-8'))
-                    file.filewcs_obj = header
-                else:
-                    header = None
-            return header.get(field_name, None) if header else None
+            if hasattr(file, 'filewcs') and file.filewcs:
+                # Decompress the WCS data and parse it as FITS header
+                wcs_data = decompress(file.filewcs.wcs)
+                values = fits_header_values(wcs_data, self._wcs_keywords) if self._plain_wcs_fields else None
+                if values is not None:
+                    return values
+                return Header.fromstring(wcs_data)  # parsed from the bytes, without decoding to a str copy first
         except Exception as e:
-            import logging
-            logging.warning(f"Error parsing WCS data for field {field_name}: {e}")
-            return None
+            logging.warning(f"Error parsing WCS data of {file.name}: {e}")
+        return None
+
+    @staticmethod
+    def _extract_fits_field(file: File, field_name: str):
+        """Extract field from the FITS header decoded by _prepare_headers."""
+        header = file.header_obj
+        return header.get(field_name, None) if header else None
+
+    @staticmethod
+    def _extract_platesolving_field(file: File, field_name: str):
+        """Extract field from the WCS data decoded by _prepare_headers."""
+        header = file.filewcs_obj
+        return header.get(field_name, None) if header else None
 
 
 class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
@@ -187,10 +322,9 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
         self.downButton.clicked.connect(self._move_items_down)
 
         # List widget selection changes
+        # (adding and removing items update the buttons themselves: moving items up/down takes and re-inserts
+        # rows, so the model's row signals would fire twice per moved item without changing anything)
         self.selectedItemsListWidget.itemSelectionChanged.connect(self._update_button_states)
-        self.selectedItemsListWidget.model().rowsInserted.connect(self._update_button_states)
-        self.selectedItemsListWidget.model().rowsRemoved.connect(self._update_button_states)
-        self.selectedItemsListWidget.model().modelReset.connect(self._update_button_states)
 
         # accept and cancel
         self.buttonBox.accepted.connect(self.start_export)
@@ -198,6 +332,9 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
 
     def _initialize_dialog(self):
         """Initialize the dialog with default values and populate combo boxes."""
+        # (source_type, field_name) of every item in the list, for the duplicate check
+        self._selected_set: set[tuple[str, str]] = set()
+
         # Populate photonfinder combo box with File and Image model fields
         self._populate_photonfinder_combo()
 
@@ -235,11 +372,11 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
             if not field_name.startswith('_') and field_name not in exclude_fields:
                 image_fields.append(f"Image.{field_name}")
 
-        # Combine and sort fields
-        all_fields = sorted(file_fields + image_fields)
+        # Combine and sort fields, kept in step with the combo box so removed items go back in place
+        self._photonfinder_items = sorted(file_fields + image_fields)
 
         # Add fields to combo box
-        self.photonFinderComboBox.addItems(all_fields)
+        self.photonFinderComboBox.addItems(self._photonfinder_items)
 
     def _populate_fits_combo(self):
         """Populate FITS combo box with known FITS keywords (editable)."""
@@ -267,11 +404,14 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
             item = QListWidgetItem(current_text)
             item.setData(Qt.UserRole, ("photonfinder", current_text))  # Store source type and original field name
             self.selectedItemsListWidget.addItem(item)
+            self._selected_set.add(("photonfinder", current_text))
+            self._update_button_states()
 
             # Remove from combo box to prevent duplicate selection
             current_index = self.photonFinderComboBox.currentIndex()
             if current_index >= 0:
                 self.photonFinderComboBox.removeItem(current_index)
+                del self._photonfinder_items[current_index]
 
     def _add_fits_item(self):
         """Add selected FITS item to the list."""
@@ -282,6 +422,8 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
             item = QListWidgetItem(display_text)
             item.setData(Qt.UserRole, ("fits", current_text))  # Store source type and original field name
             self.selectedItemsListWidget.addItem(item)
+            self._selected_set.add(("fits", current_text))
+            self._update_button_states()
 
             # For editable combo, clear the text but keep the items
             self.fitsComboBox.setCurrentText("")
@@ -295,20 +437,15 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
             item = QListWidgetItem(display_text)
             item.setData(Qt.UserRole, ("platesolving", current_text))  # Store source type and original field name
             self.selectedItemsListWidget.addItem(item)
+            self._selected_set.add(("platesolving", current_text))
+            self._update_button_states()
 
             # For editable combo, clear the text but keep the items
             self.plateSolvingComboBox.setCurrentText("")
 
     def _is_item_already_added(self, field_name: str, source_type: str) -> bool:
         """Check if an item with the same field name and source type is already in the list."""
-        for i in range(self.selectedItemsListWidget.count()):
-            item = self.selectedItemsListWidget.item(i)
-            item_data = item.data(Qt.UserRole)
-            if isinstance(item_data, tuple) and len(item_data) == 2:
-                existing_source, existing_field = item_data
-                if existing_source == source_type and existing_field == field_name:
-                    return True
-        return False
+        return (source_type, field_name) in self._selected_set
 
     def _get_list_items(self):
         """Get all items currently in the selected items list."""
@@ -327,7 +464,8 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
             # Return item to appropriate combo box based on source type
             if source_type == "photonfinder":
                 # Add back to photonfinder combo box in sorted order
-                self._add_item_to_combo_sorted(self.photonFinderComboBox, original_field_name)
+                self._add_item_to_combo_sorted(self.photonFinderComboBox, self._photonfinder_items,
+                                               original_field_name)
             elif source_type == "fits":
                 # FITS combo is editable, so we don't need to add it back
                 pass
@@ -338,18 +476,15 @@ class MetadataReportDialog(QDialog, Ui_MetadataReportDialog):
             # Remove from list widget
             row = self.selectedItemsListWidget.row(item)
             self.selectedItemsListWidget.takeItem(row)
+            self._selected_set.discard((source_type, original_field_name))
+        self._update_button_states()
 
-    def _add_item_to_combo_sorted(self, combo_box, item_text):
-        """Add an item to a combo box in sorted order."""
-        # Get all current items
-        items = [combo_box.itemText(i) for i in range(combo_box.count())]
-        items.append(item_text)
-        items.sort()
-
-        # Clear and re-add all items
-        combo_box.clear()
-        combo_box.addItems(items)
-        self.buttonBox.button(QDialogButtonBox.StandardButton.Ok).setEnabled(len(items) > 0)
+    @staticmethod
+    def _add_item_to_combo_sorted(combo_box, items: list[str], item_text):
+        """Add an item to a combo box in sorted order, *items* being the sorted texts of the combo box."""
+        index = bisect.bisect_left(items, item_text)
+        items.insert(index, item_text)
+        combo_box.insertItem(index, item_text)
 
     def _move_items_up(self):
         """Move selected items up in the list."""
@@ -16,6 +16,7 @@ class ProgressDialog(QDialog, Ui_ProgressDialog):
         self.task.total_found.connect(self.progressBar.setMaximum)
         self.task.finished.connect(self.on_finished)
         self.task.message.connect(self.label.setText)
+        self.task.row_update.connect(self.on_row_update)
         self.task.error.connect(self.on_error)
         self.buttonBox.rejected.connect(self.on_cancel)
 
@@ -24,6 +25,10 @@ class ProgressDialog(QDialog, Ui_ProgressDialog):
             self.task.cancel()
         self.reject()
 
+    def on_row_update(self, index: int, message: str):
+        self.progressBar.setValue(index)
+        self.label.setText(message)
+
     def on_finished(self):
         self.accept()
 
@@ -3,7 +3,7 @@ from datetime import datetime
 from functools import reduce, cmp_to_key
 from itertools import chain
 from pathlib import Path
-from typing import List, Set
+from typing import List, Set, Iterable
 
 from PySide6.QtGui import QAction
 from astropy import units as u
@@ -11,6 +11,7 @@ from astropy import units as u
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QWidget, QDialogButtonBox, QTableWidgetItem, QFileDialog, QMessageBox, QMenu
 from astropy.coordinates import SkyCoord
+from peewee import chunked
 
 from photonfinder.core import ApplicationContext, Change
 from photonfinder.models import Project, File, LibraryRoot, ProjectFile, Image, hp, RootAndPath
@@ -34,6 +35,7 @@ class ProjectEditDialog(QWidget, Ui_ProjectEditDialog):
         self.name_edit.setText(self.project.name)
         self.links_to_delete = set()
         self.links_to_add = set()
+        self._columns_sized = False
         self.project_files = list(ProjectFile.select(ProjectFile, File, LibraryRoot, Image)
                                   .join(File)
                                   .join_from(File, Image)
@@ -60,20 +62,30 @@ class ProjectEditDialog(QWidget, Ui_ProjectEditDialog):
         self.connect_signals()
 
     def refresh_table(self):
-        self.tableWidget.clearContents()
-        updated_files = self.get_current_files()
-        updated_files.sort(key=lambda pf: (pf.file.root.rowid, pf.file.path, pf.file.name))
-        self.tableWidget.setRowCount(len(updated_files))
-
-        for row, project_file in enumerate(updated_files):
-            first_item = QTableWidgetItem(project_file.file.root.name)
-            first_item.setData(Qt.UserRole, project_file)
-            self.tableWidget.setItem(row, 0, first_item)
-            self.tableWidget.setItem(row, 1, QTableWidgetItem(project_file.file.path))
-            self.tableWidget.setItem(row, 2, QTableWidgetItem(project_file.file.name))
-            self.tableWidget.setItem(row, 3, QTableWidgetItem(_format_timestamp(project_file.file.mtime_millis)))
-
-        self.tableWidget.resizeColumnsToContents()
+        # with sorting on, every setItem re-sorts the table (and can move the row being filled), so fill it unsorted
+        # and without repaints, then sort once
+        self.tableWidget.setSortingEnabled(False)
+        self.tableWidget.setUpdatesEnabled(False)
+        try:
+            self.tableWidget.clearContents()
+            updated_files = self.get_current_files()
+            updated_files.sort(key=lambda pf: (pf.file.root.rowid, pf.file.path, pf.file.name))
+            self.tableWidget.setRowCount(len(updated_files))
+
+            for row, project_file in enumerate(updated_files):
+                first_item = QTableWidgetItem(project_file.file.root.name)
+                first_item.setData(Qt.UserRole, project_file)
+                self.tableWidget.setItem(row, 0, first_item)
+                self.tableWidget.setItem(row, 1, QTableWidgetItem(project_file.file.path))
+                self.tableWidget.setItem(row, 2, QTableWidgetItem(project_file.file.name))
+                self.tableWidget.setItem(row, 3, QTableWidgetItem(_format_timestamp(project_file.file.mtime_millis)))
+        finally:
+            self.tableWidget.setUpdatesEnabled(True)
+            self.tableWidget.setSortingEnabled(True)
+        if not self._columns_sized:
+            # size the columns to the initial contents only, later refreshes keep the user's column widths
+            self.tableWidget.resizeColumnsToContents()
+            self._columns_sized = True
         self.enable_disable_actions()
 
     def get_current_files(self):
@@ -93,8 +105,10 @@ class ProjectEditDialog(QWidget, Ui_ProjectEditDialog):
                 if self.links_to_delete:
                     self.context.signal_bus.project_links_changed.emit(self.links_to_delete, Change.DELETE)
 
-                for link in self.links_to_add:
-                    link.save(force_insert=True)
+                # one multi-row INSERT per batch instead of a statement per link
+                rows = [{'project': link.project, 'file': link.file} for link in self.links_to_add]
+                for batch in chunked(rows, 500):
+                    ProjectFile.insert_many(batch).execute()
                 if self.links_to_add:
                     self.context.signal_bus.project_links_changed.emit(self.links_to_add, Change.CREATE_OR_UPDATE)
         self.close()
@@ -160,10 +174,8 @@ class ProjectEditDialog(QWidget, Ui_ProjectEditDialog):
             q = q.where(File.root == root)
         q = q.order_by(File.root, File.path, File.name)
 
-        for f in q.execute():
-            # TODO: should we filter again on actual distance?
-            pf = ProjectFile(file=f, project=self.project)
-            self.add_file(pf)
+        # TODO: should we filter again on actual distance?
+        self.add_project_files(ProjectFile(file=f, project=self.project) for f in q.execute())
 
         self.refresh_table()
 
@@ -205,15 +217,10 @@ class ProjectEditDialog(QWidget, Ui_ProjectEditDialog):
         if not files:
             return
 
-        mismatches: List[str] = list()
-        added_files: List[File] = list()
-        for f in files:
-            db_file = ProjectFile.find_by_filename(f, self.project)
-            if not db_file:
-                mismatches.append(f)
-            else:
-                self.add_file(db_file)
-                added_files.append(db_file.file)
+        found_by_path = ProjectFile.find_by_filenames(files, self.project)
+        mismatches: List[str] = [f for f in files if f not in found_by_path]
+        found: List[ProjectFile] = [found_by_path[f] for f in files if f in found_by_path]
+        self.add_project_files(found)
 
         if mismatches:
             QMessageBox.warning(self, "Some Files could not be added",
@@ -223,18 +230,24 @@ class ProjectEditDialog(QWidget, Ui_ProjectEditDialog):
                                 "\n".join(mismatches))
 
         if not self.name_edit.text():
-            name = (Image.select(Image.object_name)
-                    .where(Image.file.in_(added_files))
-                    .limit(1)).scalar()
-            self.name_edit.setText(name)
+            # find_by_filenames already loaded the images of the files
+            name = next((db_file.file.image.object_name for db_file in found
+                         if hasattr(db_file.file, 'image') and db_file.file.image.object_name), None)
+            if name:
+                self.name_edit.setText(name)
 
         self.refresh_table()
 
     def add_file(self, db_file: ProjectFile):
-        if db_file not in self.project_files:
-            self.links_to_add.add(db_file)
-        if db_file in self.links_to_delete:  # remove deletion marker
-            self.links_to_delete.remove(db_file)
+        self.add_project_files([db_file])
+
+    def add_project_files(self, db_files: Iterable[ProjectFile]):
+        """Mark a batch of links for addition; the persisted links are hashed once instead of scanned per file."""
+        persisted = set(self.project_files)
+        for db_file in db_files:
+            if db_file not in persisted:
+                self.links_to_add.add(db_file)
+            self.links_to_delete.discard(db_file)  # remove deletion marker
 
     def prompt_add_files(self):
         custom_filter = (
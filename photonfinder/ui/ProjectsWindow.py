@@ -62,26 +62,32 @@ class ProjectsWindow(QWidget, Ui_ProjectsWindow):
         self._loader.reload_projects()
 
     def _on_projects_loaded(self, projects):
-        self.tableWidget.clearContents()
-        self.tableWidget.setRowCount(len(projects))
-
-        for row, project in enumerate(projects):
-            name_item = QTableWidgetItem(project.name)
-            name_item.setData(Qt.UserRole, project)
-            self.tableWidget.setItem(row, 0, name_item)
-            date_str = project.date_obs
-            date_iso = datetime.fromisoformat(date_str) if date_str else None
-            self.tableWidget.setItem(row, 1, QTableWidgetItem(_format_date(date_iso)))
-            self.tableWidget.setItem(row, 2, QTableWidgetItem(str(project.file_counts)))
-            if hasattr(project, 'image'):
-                image = project.image
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(_format_ra(image.coord_ra)))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(_format_dec(image.coord_dec)))
-                self.tableWidget.setItem(row, 5, QTableWidgetItem(getattr(project, '_constellation', "")))
-            last_change = project.last_change
-            last_change_dt = datetime.fromisoformat(last_change) if isinstance(last_change, str) else last_change
-            self.tableWidget.setItem(row, 6, QTableWidgetItem(_format_date(last_change_dt)))
-
+        # with sorting on, every setItem re-sorts the table and can move the row still being filled
+        self.tableWidget.setSortingEnabled(False)
+        self.tableWidget.setUpdatesEnabled(False)
+        try:
+            self.tableWidget.clearContents()
+            self.tableWidget.setRowCount(len(projects))
+
+            for row, project in enumerate(projects):
+                name_item = QTableWidgetItem(project.name)
+                name_item.setData(Qt.UserRole, project)
+                self.tableWidget.setItem(row, 0, name_item)
+                date_str = project.date_obs
+                date_iso = datetime.fromisoformat(date_str) if date_str else None
+                self.tableWidget.setItem(row, 1, QTableWidgetItem(_format_date(date_iso)))
+                self.tableWidget.setItem(row, 2, QTableWidgetItem(str(project.file_counts)))
+                if hasattr(project, 'image'):
+                    image = project.image
+                    self.tableWidget.setItem(row, 3, QTableWidgetItem(_format_ra(image.coord_ra)))
+                    self.tableWidget.setItem(row, 4, QTableWidgetItem(_format_dec(image.coord_dec)))
+                    self.tableWidget.setItem(row, 5, QTableWidgetItem(getattr(project, '_constellation', "")))
+                last_change = project.last_change
+                last_change_dt = datetime.fromisoformat(last_change) if isinstance(last_change, str) else last_change
+                self.tableWidget.setItem(row, 6, QTableWidgetItem(_format_date(last_change_dt)))
+        finally:
+            self.tableWidget.setUpdatesEnabled(True)
+            self.tableWidget.setSortingEnabled(True)
         self.tableWidget.resizeColumnsToContents()
         self._apply_filter(self.filterEdit.text())
         if self._pending_select_project is not None:
@@ -162,8 +168,7 @@ class ProjectsWindow(QWidget, Ui_ProjectsWindow):
         files_to_add = File.remove_already_mapped(project, files)
         edit_dialog = ProjectEditDialog(context=self.context, project=project,
                                         parent=self.main_window, main_window=self.main_window)
-        for file in files_to_add:
-            edit_dialog.add_file(ProjectFile(project=project, file=file))
+        edit_dialog.add_project_files(ProjectFile(project=project, file=file) for file in files_to_add)
         edit_dialog.show()
         edit_dialog.refresh_table()
         event.acceptProposedAction()
@@ -228,7 +233,10 @@ class ProjectsWindow(QWidget, Ui_ProjectsWindow):
         with self.context.database.atomic():
             leader.name = ",".join(map(lambda p: p.name, projects))
             leader.last_change = datetime.now()
-            leader.save()
+            # only these two columns change; no need to write back the whole row
+            (Project.update(name=leader.name, last_change=leader.last_change)
+             .where(Project.rowid == leader.rowid)
+             .execute())
             ProjectFile.update(project=leader).where(ProjectFile.project.in_(to_merge_ids)).execute()
             Project.delete().where(Project.rowid.in_(to_merge_ids)).execute()
             self.context.signal_bus.projects_changed.emit([leader], Change.CREATE_OR_UPDATE)
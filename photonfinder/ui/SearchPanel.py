@@ -13,7 +13,7 @@ from PySide6.QtWidgets import *
 
 from photonfinder.core import ApplicationContext, decompress, Change
 from photonfinder.filesystem import is_compressible, parse_FITS_header, decode_header_blob
-from photonfinder.models import SearchCriteria, CORE_MODELS, Image, RootAndPath, File, FitsHeader, Project, NO_PROJECT, \
+from photonfinder.models import SearchCriteria, Image, RootAndPath, File, FitsHeader, Project, NO_PROJECT, \
     FileWCS, ProjectFile, LibraryRoot
 from .BackgroundLoader import SearchResultsLoader, GenericControlLoader, PlateSolveTask, FileListTask, ImageAnalysisTask
 from .DateRangeDialog import DateRangeDialog
@@ -75,6 +75,9 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         self.mainWindow = mainWindow
         self.search_criteria = SearchCriteria() #TODO: previous / next?
         self.advanced_options = dict()
+        # first selected file, looked up once per selection change (see get_selected_file)
+        self._selected_file: File | None = None
+        self._selected_file_valid = False
         self.total_files = 0  # Track total number of files in search results
         self.pending_selections = list()  # Store pending path selections
 
@@ -105,6 +108,8 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         self.dataView.customContextMenuRequested.connect(self.show_context_menu)
         # Connect selection changes
         self.dataView.selectionModel().selectionChanged.connect(self.on_data_selection_changed)
+        self.data_model.rowsRemoved.connect(self._invalidate_selected_file)
+        self.data_model.modelReset.connect(self._invalidate_selected_file)
         self.dataView.installEventFilter(self)
         self.visibility_controller = ColumnVisibilityController(self.dataView, context=context.settings)
         self.has_more_results = False
@@ -328,13 +333,11 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         logging.log(DEBUG, f"data for {target.objectName()}: {data}")
         self.update_in_progress = True
         current_text = target.currentText()
+        # repopulate in one go: no per-item index-changed signals or repaints
+        target.blockSignals(True)
+        target.setUpdatesEnabled(False)
         target.clear()
-        target.addItem(RESET_LABEL)
-        for datum in data:
-            if datum == "" or datum is None:
-                target.addItem(EMPTY_LABEL)
-            else:
-                target.addItem(datum)
+        target.addItems([RESET_LABEL] + [EMPTY_LABEL if datum == "" or datum is None else datum for datum in data])
 
         # Calculate appropriate width based on the longest item
         fm = target.fontMetrics()
@@ -356,10 +359,16 @@ class SearchPanel(QFrame, Ui_SearchPanel):
             target.addItem(current_text)
 
         target.setCurrentText(current_text)
+        target.setUpdatesEnabled(True)
+        target.blockSignals(False)
         self.update_in_progress = False
 
+    def _invalidate_selected_file(self):
+        self._selected_file_valid = False
+
     def on_data_selection_changed(self, selected, deselected):
         """Handle selection changes in the data grid."""
+        self._invalidate_selected_file()
         # Get the number of selected rows
         selected_count = len(self.dataView.selectionModel().selectedRows())
 
@@ -493,7 +502,6 @@ class SearchPanel(QFrame, Ui_SearchPanel):
                         object_item.setText(file.image.object_name)
                         object_item.setData(file.image.object_name, SORT_ROLE)
                     if file.image.date_obs is not None:
-                        from zoneinfo import ZoneInfo
                         utctime = file.image.date_obs.replace(tzinfo=timezone.utc)
                         localtime = utctime.astimezone(tz=None)
                         date_obs_item.setText(_format_date(localtime))
@@ -717,10 +725,9 @@ class SearchPanel(QFrame, Ui_SearchPanel):
 
         select_project_actions = []
         if selected_file:
-            with self.context.database.bind_ctx(CORE_MODELS):
-                file_projects = list(
-                    Project.select().join(ProjectFile).where(ProjectFile.file == selected_file.rowid)
-                )
+            file_projects = list(
+                Project.select().join(ProjectFile).where(ProjectFile.file == selected_file.rowid)
+            )
             if file_projects:
                 menu.addSeparator()
                 if len(file_projects) == 1:
@@ -780,9 +787,8 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         name_index = self.dataView.model().index(index.row(), 0)
 
         # Get the full filename from the name item's data
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file = self.dataView.model().data(name_index, ROWID_ROLE)
-            filename = file.full_filename()
+        file = self.dataView.model().data(name_index, ROWID_ROLE)
+        filename = file.full_filename()
 
         if filename:
             # clean up the environment for PixInsight/QT - can't find it's plugins otherwise
@@ -807,9 +813,8 @@ class SearchPanel(QFrame, Ui_SearchPanel):
     def show_file_location(self, index):
         """Reveal the file in the system file manager."""
         name_index = self.dataView.model().index(index.row(), 0)
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file = self.dataView.model().data(name_index, ROWID_ROLE)
-            filename = file.full_filename()
+        file = self.dataView.model().data(name_index, ROWID_ROLE)
+        filename = file.full_filename()
 
         if not filename:
             return
@@ -826,8 +831,7 @@ class SearchPanel(QFrame, Ui_SearchPanel):
     def view_file(self, index):
         """Open the file at the given index in the internal image viewer."""
         name_index = self.dataView.model().index(index.row(), 0)
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file = self.dataView.model().data(name_index, ROWID_ROLE)
+        file = self.dataView.model().data(name_index, ROWID_ROLE)
         if file and self.mainWindow:
             selected = self.dataView.selectionModel().selectedRows()
             rows = sorted(i.row() for i in selected) if len(selected) > 1 else None
@@ -838,8 +842,7 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         if row < 0 or row >= self.dataView.model().rowCount():
             return None
         name_index = self.dataView.model().index(row, 0)
-        with self.context.database.bind_ctx(CORE_MODELS):
-            return self.dataView.model().data(name_index, ROWID_ROLE)
+        return self.dataView.model().data(name_index, ROWID_ROLE)
 
     def mark_file_as_bad(self, file: File, model_row: int) -> bool:
         """Rename the file with BAD_ prefix and remove it from the database and grid."""
@@ -861,8 +864,7 @@ class SearchPanel(QFrame, Ui_SearchPanel):
                 f"does not match this name. The file will be re-imported on the next library scan.\n\n"
                 f"Go to Settings and add a pattern that matches 'bad*' to prevent this."
             )
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file.delete_instance()
+        file.delete_instance()
         self.data_model.removeRow(model_row)
         self.total_files -= 1
         if self.search_criteria.is_empty():
@@ -873,10 +875,9 @@ class SearchPanel(QFrame, Ui_SearchPanel):
 
     def clear_plate_solution(self, file: File, model_row: int):
         """Delete the FileWCS for the given file and update the grid row."""
-        with self.context.database.bind_ctx(CORE_MODELS):
-            wcs = FileWCS.get_or_none(FileWCS.file == file)
-            if wcs:
-                wcs.delete_instance()
+        wcs = FileWCS.get_or_none(FileWCS.file == file)
+        if wcs:
+            wcs.delete_instance()
         model = self.dataView.model()
         model.setData(model.index(model_row, 15), "", Qt.DisplayRole)
         model.setData(model.index(model_row, 15), None, SORT_ROLE)
@@ -900,21 +901,20 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         name_index = self.dataView.model().index(index.row(), 0)
 
         # Get the file object from the name item's data
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file = self.dataView.model().data(name_index, ROWID_ROLE)
-            if not file:
-                return
+        file = self.dataView.model().data(name_index, ROWID_ROLE)
+        if not file:
+            return
 
-            # Get the library root and path
-            root_id = file.root.rowid
-            path = file.path
+        # Get the library root and path
+        root_id = file.root.rowid
+        path = file.path
 
-            # Create a RootAndPath object
-            root_and_path = RootAndPath(root_id=root_id, root_label=file.root.name, path=path)
-            self.filesystemTreeView.selectionModel().clearSelection()
-            # Find and select the node in the tree
-            self._find_and_select_node(root_and_path)
-            self.update_search_criteria()
+        # Create a RootAndPath object
+        root_and_path = RootAndPath(root_id=root_id, root_label=file.root.name, path=path)
+        self.filesystemTreeView.selectionModel().clearSelection()
+        # Find and select the node in the tree
+        self._find_and_select_node(root_and_path)
+        self.update_search_criteria()
 
     def show_file_details(self, index):
         """Show the cached FITS header for the selected file."""
@@ -922,38 +922,37 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         name_index = self.dataView.model().index(index.row(), 0)
 
         # Get the file object from the name item's data
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file = self.dataView.model().data(name_index, ROWID_ROLE)
-            if not file:
-                QMessageBox.warning(self, "Warning", "No file selected.")
-                return
+        file = self.dataView.model().data(name_index, ROWID_ROLE)
+        if not file:
+            QMessageBox.warning(self, "Warning", "No file selected.")
+            return
 
-            try:
-                # Try to get the FitsHeader for this file
-                fits_header = FitsHeader.get(FitsHeader.file == file)
-                wcs: FileWCS = FileWCS.get_or_none(FileWCS.file == file)
-                from astropy.io.fits import Header
-                header: Header = decode_header_blob(fits_header.header)
-
-                if wcs:
-                    wcs_bytes = decompress(wcs.wcs)
-                    wcs_header: Header = parse_FITS_header(wcs_bytes)
-                else:
-                    wcs_header = None
+        try:
+            # Try to get the FitsHeader for this file
+            fits_header = FitsHeader.get(FitsHeader.file == file)
+            wcs: FileWCS = FileWCS.get_or_none(FileWCS.file == file)
+            from astropy.io.fits import Header
+            header: Header = decode_header_blob(fits_header.header)
+
+            if wcs:
+                wcs_bytes = decompress(wcs.wcs)
+                wcs_header: Header = parse_FITS_header(wcs_bytes)
+            else:
+                wcs_header = None
 
-                # Show the header dialog
-                dialog = HeaderDialog(header, wcs_header, parent=self)
-                dialog.setAttribute(Qt.WA_DeleteOnClose)
-                dialog.setWindowFlags(Qt.Window)
-                dialog.show()
+            # Show the header dialog
+            dialog = HeaderDialog(header, wcs_header, parent=self)
+            dialog.setAttribute(Qt.WA_DeleteOnClose)
+            dialog.setWindowFlags(Qt.Window)
+            dialog.show()
 
-            except FitsHeader.DoesNotExist:
-                QMessageBox.information(self, "No Cached Header",
-                                        f"No cached header found for file: {file.name}")
-            except Exception as e:
-                logging.error(e, exc_info=True)
-                QMessageBox.critical(self, "Error",
-                                     f"Error reading cached header: {str(e)}")
+        except FitsHeader.DoesNotExist:
+            QMessageBox.information(self, "No Cached Header",
+                                    f"No cached header found for file: {file.name}")
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            QMessageBox.critical(self, "Error",
+                                 f"Error reading cached header: {str(e)}")
 
     def _find_and_select_node(self, root_and_path):
         """Find and select a node in the tree view based on RootAndPath."""
@@ -1313,7 +1312,7 @@ class SearchPanel(QFrame, Ui_SearchPanel):
                 dialog.set_coordinates(ra_str, dec_str, self.search_criteria.coord_radius)
             except Exception as e:
                 logging.error(f"Error setting coordinates from selected image: {str(e)}")
-        elif self.search_criteria.coord_ra and self.search_criteria.coord_dec:
+        elif self.search_criteria.has_coords():
             # Use the existing search criteria
             dialog.set_coordinates(
                 self.search_criteria.coord_ra,
@@ -1346,6 +1345,12 @@ class SearchPanel(QFrame, Ui_SearchPanel):
 
     def get_selected_file(self) -> File | None:
         """Get the image data of the first selected file, if any."""
+        if not self._selected_file_valid:
+            self._selected_file = self._find_selected_file()
+            self._selected_file_valid = True
+        return self._selected_file
+
+    def _find_selected_file(self) -> File | None:
         selected_rows = self.dataView.selectionModel().selectedRows()
         if not selected_rows:
             return None
@@ -1357,9 +1362,8 @@ class SearchPanel(QFrame, Ui_SearchPanel):
         name_index = self.dataView.model().index(first_row, 0)
 
         # Get the file object from the name item's data
-        with self.context.database.bind_ctx(CORE_MODELS):
-            file = self.dataView.model().data(name_index, ROWID_ROLE)
-            return file
+        file = self.dataView.model().data(name_index, ROWID_ROLE)
+        return file
 
     def get_selected_image(self) -> Image | None:
         file = self.get_selected_file()
@@ -1460,8 +1464,7 @@ class SearchPanel(QFrame, Ui_SearchPanel):
             self.filesystemTreeView.selectionModel().clearSelection()
 
     def apply_search_criteria(self, criteria: SearchCriteria):
-        import copy
-        self.search_criteria = copy.deepcopy(criteria)
+        self.search_criteria = criteria.clone()
         self.update_in_progress = True
         if len(self.library_tree_model.loaded_library_roots) == 0:
             self.library_tree_model.library_roots_loader.library_roots_loaded.connect(self._apply_pending_path_criteria)
@@ -1528,7 +1531,7 @@ class SearchPanel(QFrame, Ui_SearchPanel):
             filter_button.on_remove_filter.connect(self.reset_temperature_criteria)
             self.add_filter_button_control(filter_button)
 
-        if criteria.coord_ra and criteria.coord_dec:
+        if criteria.has_coords():
             if criteria.coord_query:
                 text = f"Coordinates: {criteria.coord_query}, r={criteria.coord_radius:.2f}°"
             else:
@@ -28,7 +28,7 @@ class TargetObjectReportWindow(QMainWindow, Ui_TargetObjectReportWindow, TableWi
         from .SearchPanel import SearchPanel
         self.search_panel: SearchPanel = self.parent()
         self.search_panel.search_criteria_changed.connect(self.load_report)
-        self.search_panel.mainWindow.tabs_changed.connect(self.on_tabs_changed)
+        self.search_panel.mainWindow.tab_title_changed.connect(self.on_tab_title_changed)
         self.buttonBox.button(QDialogButtonBox.StandardButton.Save).clicked.connect(self.save_data)
         self.on_tabs_changed()
         self.load_report()
@@ -36,6 +36,10 @@ class TargetObjectReportWindow(QMainWindow, Ui_TargetObjectReportWindow, TableWi
     def on_tabs_changed(self):
         self.tabname_label.setText(self.search_panel.title)
 
+    def on_tab_title_changed(self, panel, title: str):
+        if panel is self.search_panel:
+            self.tabname_label.setText(title)
+
     def load_report(self):
         self.loader.start(self.tableWidget, self.search_panel.search_criteria)
 
@@ -1,17 +1,18 @@
 import csv
 import logging
-from copy import deepcopy
+import math
 from dataclasses import dataclass
 from typing import List, Tuple
 
 import astropy.units as u
+import numpy as np
 import requests
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QIntValidator
 from PySide6.QtWidgets import QDialog, QMessageBox, QFileDialog, QDialogButtonBox, QTableWidgetItem
 from astropy.coordinates import SkyCoord, Angle
 
-from photonfinder.core import ApplicationContext
+from photonfinder.core import ApplicationContext, hp, unit_vector
 from photonfinder.models import SearchCriteria, File, Image, LibraryRoot
 from photonfinder.ui.BackgroundLoader import ProgressBackgroundTask
 from photonfinder.ui.generated.TelescopiusCompareDialog_ui import Ui_TelescopiusCompareDialog
@@ -73,29 +74,49 @@ def get_telescopius_json(url: str) -> dict:
     return response.json()
 
 
+# below this many candidates a full vectorized scan per target is cheaper than building the pixel buckets
+BUCKET_MIN_ROWS = 5000
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+def _bucket_by_pixel(pixels: List[int | None]) -> dict[int, np.ndarray]:
+    """Map each HEALPix pixel to the indices of the candidate rows in it."""
+    buckets: dict[int, list[int]] = {}
+    for i, pixel in enumerate(pixels):
+        if pixel is not None:
+            buckets.setdefault(pixel, []).append(i)
+    return {pixel: np.array(idx, dtype=np.intp) for pixel, idx in buckets.items()}
+
+
 def enrich_telescopius_data(targets: List[TelescopiusTarget],
                             search_criteria: SearchCriteria,
                             tolerance: float) -> List[Tuple[str, str, str, str]]:
     results = []
+    min_dot = math.cos(math.radians(tolerance))
+    # the criteria part is the same for every target: load the plate-solved candidates once and match each
+    # target against them with a vectorized dot product instead of a query per target
+    query = (File.select(LibraryRoot.name, File.path, Image.coord_ra, Image.coord_dec, Image.coord_pix256)
+             .join_from(File, Image)
+             .join_from(File, LibraryRoot)
+             .where(Image.coord_ra.is_null(False) & Image.coord_dec.is_null(False)))
+    query = Image.apply_search_criteria(query, search_criteria, Image.coord_pix256)
+    rows = list(query.tuples())
+    labels = np.array([root_name + ":" + path for root_name, path, _, _, _ in rows], dtype=object)
+    ra = np.radians(np.array([row[2] for row in rows], dtype=float))
+    dec = np.radians(np.array([row[3] for row in rows], dtype=float))
+    cx, cy, cz = np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)
+    # large libraries: bucket candidates by HEALPix pixel so a target only looks at the rows in its cone
+    buckets = _bucket_by_pixel([row[4] for row in rows]) if len(rows) >= BUCKET_MIN_ROWS else None
     for target in targets:
         try:
-            query = (File.select(File, Image, LibraryRoot)
-                     .join_from(File, Image)
-                     .join_from(File, LibraryRoot))
-            full_criteria = deepcopy(search_criteria)
-            full_criteria.coord_ra = str(target.coord().ra.hourangle)
-            full_criteria.coord_dec = str(target.coord().dec.deg)
-            full_criteria.coord_radius = tolerance
-            query = Image.apply_search_criteria(query, full_criteria, None)
-            files = query.execute()
-            paths = set()
-            for file in files:
-                image = file.image
-                img_coord = image.get_sky_coord()
-                # check distance to target
-                if img_coord.separation(target.coord()).deg < tolerance:
-                    paths.add(file.root.name + ":" + file.path)
-
+            if buckets is None:
+                idx = slice(None)
+            else:
+                pixels = hp.cone_search_lonlat(target.ra_hr * u.hourangle, target.dec * u.deg, tolerance * u.deg)
+                idx = np.concatenate([buckets.get(int(p), _EMPTY) for p in pixels])
+            tx, ty, tz = unit_vector(target.ra_hr * 15.0, target.dec)
+            mask = cx[idx] * tx + cy[idx] * ty + cz[idx] * tz > min_dot
+            paths = set(labels[idx][mask])
             results.append((target.name,
                             Angle(target.ra_hr * u.hourangle).to_string(unit=u.hourangle, sep=':', pad=True,
                                                                         precision=0),
@@ -1,3 +1,4 @@
+import functools
 import logging
 from datetime import datetime
 
@@ -58,18 +59,21 @@ def _format_timestamp(timestamp_ms: int):
     date_str = _format_date(dt)
     return date_str
 
+_FITS_LOGICALS = {'T': True, 'F': False}
+
+
 def coerce_value(value: str):
     """
-    Parse a string value and return it as int, float, or str.
+    Parse a string value and return it as int, float, bool, or str.
 
-    Attempts to convert the value to int first, then float,
-    otherwise returns the original string.
+    Attempts to convert the value to int first, then float, then the FITS
+    logical values T/F, otherwise returns the original string.
 
     Args:
         value: String value to parse
 
     Returns:
-        The value as int, float, or str depending on what conversion succeeds
+        The value as int, float, bool, or str depending on what conversion succeeds
     """
     try:
         return int(value)
@@ -81,10 +85,21 @@ def coerce_value(value: str):
     except ValueError:
         pass
 
+    if value in _FITS_LOGICALS:
+        return _FITS_LOGICALS[value]
     return value
 
 
 def create_colored_svg_icon(svg_path: str, size: QSize, color, add_slash=False) -> QIcon:
+    # QSize/QColor aren't hashable, cache on their plain values; QIcon is implicitly shared so handing out
+    # the same instance is fine
+    return _colored_svg_icon(svg_path, size.width(), size.height(), QColor(color).rgba(), add_slash)
+
+
+@functools.lru_cache(maxsize=128)
+def _colored_svg_icon(svg_path: str, width: int, height: int, rgba: int, add_slash: bool) -> QIcon:
+    size = QSize(width, height)
+    color = QColor.fromRgba(rgba)
     renderer = QSvgRenderer(svg_path)
     pixmap = QPixmap(size)
     pixmap.fill(Qt.transparent)
@@ -1,6 +1,8 @@
 import dataclasses
 import json
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import List
 
@@ -57,7 +59,25 @@ class SessionManager:
         return []
 
     def save_sessions(self, sessions: List[Session]):
-        with open(self.file, mode='wb') as fd:
-            json_str = sessions_to_json(sessions)
-            fd.write(json_str.encode("UTF-8"))
+        # serialize before touching the file and swap it in whole, so a failure or an exit mid-write
+        # leaves the previous session intact
+        if not self.file:
+            return
+        data = sessions_to_json(sessions).encode("UTF-8")
+        tmp_file = f"{self.file}.tmp"
+        with open(tmp_file, mode='wb') as fd:
+            fd.write(data)
+        os.replace(tmp_file, self.file)
         logging.info(f"Session saved to {self.file}")
+
+    def save_sessions_in_background(self, sessions: List[Session]) -> threading.Thread:
+        """Save on a non-daemon thread; the interpreter waits for it before exiting."""
+        thread = threading.Thread(target=self._save_sessions_logged, args=(sessions,), name="session-save")
+        thread.start()
+        return thread
+
+    def _save_sessions_logged(self, sessions: List[Session]):
+        try:
+            self.save_sessions(sessions)
+        except Exception as e:
+            logging.error(f"Failed to save session to {self.file}: {e}")
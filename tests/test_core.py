@@ -1,7 +1,12 @@
 import logging
+import sqlite3
 
 from playhouse.reflection import print_table_sql
 
+import pytest
+from astropy.coordinates import SkyCoord
+
+from photonfinder.core import angular_separation, backup_database
 from photonfinder.models import File, LibraryRoot, Image
 
 logger = logging.getLogger('peewee')
@@ -42,3 +47,22 @@ def test_model_eq():
     root = LibraryRoot(name="dummy", path=r'C:\TEMP')
     root2 = LibraryRoot(name="dummy", path=r'C:\TEMP')
     assert root == root2
+
+
+def test_angular_separation_matches_astropy():
+    for ra1, dec1, ra2, dec2 in ((10.0, 20.0, 10.5, 20.2), (0.0, 89.9, 180.0, 89.9), (359.9, -5.0, 0.1, -5.0)):
+        expected = SkyCoord(ra1, dec1, unit='deg').separation(SkyCoord(ra2, dec2, unit='deg')).deg
+        assert angular_separation(ra1, dec1, ra2, dec2) == pytest.approx(expected)
+
+
+def test_backup_database_in_steps(database, tmp_path):
+    for i in range(50):
+        LibraryRoot.create(name=f"root{i}", path=f"C:/TEMP/{i}/" + "x" * 1000)
+    steps = []
+    backup_path = tmp_path / "backup.db"
+    backup_database(database, backup_path, pages=2, progress=lambda status, remaining, total: steps.append(remaining))
+
+    assert len(steps) > 1
+    assert steps[-1] == 0
+    with sqlite3.connect(backup_path) as target:
+        assert target.execute("select count(*) from libraryroot").fetchone() == (50,)
@@ -57,6 +57,11 @@ class TestTemplateFilename:
         result = template_filename(light1, template, settings, decompress=True)
         assert result == "test_file.fits"
 
+    def test_derived_and_unknown_fields(self, light1, settings):
+        template = string.Template("$unknown/${filename_no_ext}_$filter.$ext")
+        result = template_filename(light1, template, settings)
+        assert result == "$unknown/test_file1_Test Filter.fits"
+
     def test_last_light_path_update(self, light1, settings):
         """Test that last_light_path is updated for LIGHT images."""
         template = string.Template("output/dir/$filename")
@@ -64,6 +69,13 @@ class TestTemplateFilename:
         assert result == "output/dir/test_file1.fits"
         assert settings.get_last_light_path() == Path("output/dir")
 
+    def test_preview_mode_keeps_last_light_path(self, light1, settings):
+        """Test that rendering a preview does not update last_light_path."""
+        before = settings.get_last_light_path()
+        result = template_filename(light1, string.Template("preview/$filename"), settings, preview_mode=True)
+        assert result == "preview/test_file1.fits"
+        assert settings.get_last_light_path() == before
+
 
 class TestTemplateFilenameWithRef:
     """Tests for the template_filename_with_ref function."""
@@ -159,6 +171,88 @@ class TestExportWorker:
         assert os.path.exists(output_path)
         self.assert_wcs(output_path)
 
+    def test_copy_fits_with_custom_headers_keeps_data(self, export_worker, tmp_path):
+        import numpy as np
+        from astropy.io import fits
+        data = np.arange(64 * 64, dtype=np.uint16).reshape(64, 64)
+        source = tmp_path / "source.fits"
+        fits.PrimaryHDU(data).writeto(source)
+        output_path = str(tmp_path / "output.fits")
+
+        export_worker.copy_file(str(source), output_path, File(name="source.fits"), {"FILTER": "Ha", "SITE": "home"})
+
+        with fits.open(output_path) as hdul:
+            assert hdul[0].header["FILTER"] == "Ha"
+            assert hdul[0].header["SITE"] == "home"
+            assert (hdul[0].data == data).all()
+        assert os.path.getmtime(output_path) == os.path.getmtime(source)
+
+    def test_copy_without_preserving_times(self, export_worker, tmp_path):
+        source = tmp_path / "source.fits"
+        source.write_bytes(b"DUMMY")
+        os.utime(source, (1_000_000, 1_000_000))
+        output_path = str(tmp_path / "output.fits")
+
+        export_worker.preserve_times = False
+        export_worker.copy_file(str(source), output_path, File(name="source.fits"))
+
+        assert open(output_path, 'rb').read() == b"DUMMY"
+        assert os.path.getmtime(output_path) != os.path.getmtime(source)
+
+    def test_export_files_task_copies_and_links_once(self, export_worker, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        root = LibraryRoot.create(name="export_src", path=str(src) + "/")
+        files = []
+        for i in range(3):
+            (src / f"light{i}.fits").write_bytes(b"DUMMY")
+            files.append(File.create(root=root, path=".", name=f"light{i}.fits", size=5, mtime_millis=0))
+        project = Project.create(name="export_project")
+
+        export_worker.search_criteria = None
+        export_worker.entries = [ExportEntry(f, None) for f in files] + [ExportEntry(files[0], None)]
+        export_worker.total_files = len(export_worker.entries)
+        export_worker.output_path = str(tmp_path / "out")
+        export_worker.pattern = string.Template("$filename")
+        export_worker.project = project
+        export_worker.project_file_ids = {f.rowid for f in files}
+        progress = []
+        export_worker.progress.connect(progress.append)
+        export_worker._export_files_task()
+
+        assert sorted(os.listdir(tmp_path / "out")) == ["light0.fits", "light1.fits", "light2.fits"]
+        assert ProjectFile.select().where(ProjectFile.project == project).count() == 3
+        assert progress[-1] == 100
+
+    def test_export_files_task_links_copied_files_when_one_fails(self, export_worker, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        root = LibraryRoot.create(name="export_src_missing", path=str(src) + "/")
+        files = []
+        for i in range(3):
+            if i != 1:  # light1.fits is in the database but not on disk
+                (src / f"light{i}.fits").write_bytes(b"DUMMY")
+            files.append(File.create(root=root, path=".", name=f"light{i}.fits", size=5, mtime_millis=0))
+        project = Project.create(name="export_project_missing")
+
+        export_worker.search_criteria = None
+        export_worker.entries = [ExportEntry(f, None) for f in files]
+        export_worker.total_files = len(export_worker.entries)
+        export_worker.output_path = str(tmp_path / "out")
+        export_worker.pattern = string.Template("$filename")
+        export_worker.project = project
+        export_worker.project_file_ids = {f.rowid for f in files}
+        errors, finished = [], []
+        export_worker.error.connect(errors.append)
+        export_worker.finished.connect(lambda: finished.append(True))
+        export_worker._export_files_task()
+
+        assert sorted(os.listdir(tmp_path / "out")) == ["light0.fits", "light2.fits"]
+        linked = {pf.file.name for pf in ProjectFile.select().where(ProjectFile.project == project)}
+        assert linked == {"light0.fits", "light2.fits"}
+        assert not finished
+        assert len(errors) == 1 and "light1.fits" in errors[0]
+
 
 class TestMakeSharedTemplateStr:
     def test_braced_sess_date_replaced(self):
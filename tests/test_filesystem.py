@@ -10,11 +10,14 @@ from unittest.mock import patch
 
 import pytest
 from astropy.io.fits import Header
+from fs.info import Info
+from fs.osfs import OSFS
 
 from photonfinder.filesystem import Importer, read_fits_header, ChangeList, read_xisf_header, header_from_xisf_dict, \
-    compress_file
+    compress_file, convert_xisf_to_fits, classify_file_name, FileKind, apply_wcs_text, _scan_dir, \
+    fits_header_values, parse_FITS_header
 from photonfinder.models import LibraryRoot, File, Image, FitsHeader
-from photonfinder.filesystem import update_fits_header_cache, check_missing_header_cache
+from photonfinder.filesystem import update_fits_header_cache, check_missing_header_cache, apply_changes
 from photonfinder.fits_handlers import normalize_fits_header, NINAHandler, _normalize_image_type
 from tests.utils import fix_embedded_header
 
@@ -61,6 +64,15 @@ class TestImporter:
         change_list.apply_all()
         assert File.select().count() == NUM_FILES
 
+    def test_chunked_import(self, filesystem, database, app_context):
+        self.setup(app_context)
+        chunks = list(self.importer.iter_changes_from(filesystem, self.root, chunk_size=2))
+        assert len(chunks) > 1
+        for chunk in chunks:
+            chunk.apply_all()
+        assert sum(len(chunk.new_files) for chunk in chunks) == NUM_FILES
+        assert File.select().count() == NUM_FILES
+
     def test_delete_file(self, filesystem, database, app_context):
         self.initial_import(app_context)
 
@@ -150,6 +162,42 @@ class TestImporter:
 
         assert headers == [1, 1, 1, 1, 1, 1]
 
+    def test_apply_changes_stores_files_and_headers(self, filesystem, database, app_context, mocker):
+        from .sample_headers import header_apt
+        # the reads run on pool threads, so look at the storing thread's connection
+        connection = File._meta.database.connection()
+        in_transaction = []
+
+        def read_header(*args):
+            in_transaction.append(connection.in_transaction)
+            return fix_embedded_header(header_apt)
+
+        mocker.patch('photonfinder.filesystem.read_fits_header', side_effect=read_header)
+        for change_list in self.setup(app_context):
+            apply_changes(change_list, app_context.status_reporter, app_context.settings)
+
+        assert File.select().count() == NUM_FILES
+        assert Image.select().count() == NUM_FILES
+        assert FitsHeader.select().count() == NUM_FILES
+        # the headers are read without holding the write lock
+        assert in_transaction == [False] * NUM_FILES
+
+    def test_check_missing_header_cache_skips_unchanged_unreadable_files(self, filesystem, database, app_context,
+                                                                        mocker):
+        read = mocker.patch('photonfinder.filesystem.read_fits_header', return_value=None)
+        self.initial_import(app_context)
+        unreadable = {}
+        check_missing_header_cache(app_context.status_reporter, app_context.settings, unreadable)
+        assert read.call_count == NUM_FILES
+        assert len(unreadable) == NUM_FILES
+
+        check_missing_header_cache(app_context.status_reporter, app_context.settings, unreadable)
+        assert read.call_count == NUM_FILES
+
+        File.update(mtime_millis=File.mtime_millis + 1).where(File.rowid == next(iter(unreadable))).execute()
+        check_missing_header_cache(app_context.status_reporter, app_context.settings, unreadable)
+        assert read.call_count == NUM_FILES + 1
+
 
 def test_read_fits_header(global_test_data_dir):
     file_path = global_test_data_dir / "M106_2020-03-17T024357_60sec_LP__-15C_frame11.fit.xz"
@@ -158,6 +206,54 @@ def test_read_fits_header(global_test_data_dir):
     assert header_bytes[:80].decode('ascii').startswith('SIMPLE  ='), "FITS header should start with SIMPLE"
 
 
+@pytest.mark.parametrize("name", ["sgp_header", "header_nina", "header_sharpcap", "header_seestar", "header_pixinsight"])
+def test_fits_header_values_match_astropy(name):
+    from . import sample_headers
+    header_bytes = fix_embedded_header(getattr(sample_headers, name))
+    values = fits_header_values(header_bytes)
+    header = parse_FITS_header(header_bytes)
+    assert values
+    for keyword, value in values.items():
+        assert value == header[keyword]
+        assert type(value) is type(header[keyword])
+
+
+def test_fits_header_values_fall_back_for_hierarch():
+    from .sample_headers import header_apt
+    assert fits_header_values(fix_embedded_header(header_apt)) is None
+
+
+def _header_bytes(*cards: str) -> bytes:
+    return "".join(card.ljust(80) for card in (*cards, "END")).ljust(2880).encode("ascii")
+
+
+@pytest.mark.parametrize("value", ["1.5D3", "-.5E-2", "+7", "007", "'it''s' / comment", "''", "T / flag"])
+def test_fits_header_values_match_astropy_for_fixed_format_values(value):
+    header_bytes = _header_bytes("SIMPLE  =                    T", f"VALUE   = {value}")
+    header = parse_FITS_header(header_bytes)
+    values = fits_header_values(header_bytes)
+    assert values["VALUE"] == header["VALUE"]
+    assert type(values["VALUE"]) is type(header["VALUE"])
+    assert fits_header_values(header_bytes, ["VALUE"]) == {"VALUE": values["VALUE"]}
+
+
+@pytest.mark.parametrize("value", ["NaN", "inf", "1_000", "1.5e3", "5 junk", "'a' junk", "", "(1, 2)"])
+def test_fits_header_values_fall_back_for_nonstandard_values(value):
+    # astropy reads these differently from int()/float(), or not at all: leave them to the full parse
+    header_bytes = _header_bytes("SIMPLE  =                    T", f"VALUE   = {value}")
+    assert fits_header_values(header_bytes) is None
+    assert fits_header_values(header_bytes, ["VALUE"]) is None
+
+
+def test_fits_header_values_for_keywords():
+    from .sample_headers import header_apt
+    header_bytes = fix_embedded_header(header_apt)
+    header = parse_FITS_header(header_bytes)
+    # only the requested cards are read, so the HIERARCH card elsewhere does not matter
+    assert fits_header_values(header_bytes, ["EXPTIME", "object", "MISSING"]) == {
+        "EXPTIME": header["EXPTIME"], "OBJECT": header["OBJECT"]}
+
+
 def test_read_read_xisf_header(global_test_data_dir):
     file_path = global_test_data_dir / "2021-05-31_00-10-25__18.30_1.00s_0000.xisf"
     assert file_path.exists()
@@ -222,6 +318,66 @@ def test_header_from_xisf_dict():
         assert card1.image == card2.image
 
 
+def test_apply_wcs_text_keeps_naxis_and_copies_comments():
+    wcs = Header([("NAXIS", 2), ("NAXIS1", 10), ("CRVAL1", 1.5), ("COMMENT", "a"), ("COMMENT", "b")])
+    header = apply_wcs_text(Header([("NAXIS", 2), ("NAXIS1", 99)]), wcs.tostring())
+    assert header["NAXIS1"] == 99
+    assert header["CRVAL1"] == 1.5
+    assert list(header["COMMENT"]) == ["a", "b"]
+
+
+@pytest.mark.parametrize("name,kind", [
+    ("a.fits", FileKind.FITS), ("a.FIT", FileKind.FITS), ("a.fits.gz", FileKind.FITS_COMPRESSED),
+    ("a.FITS.xz", FileKind.FITS_COMPRESSED), ("a.xisf", FileKind.XISF), ("a.xisf.gz", FileKind.OTHER),
+    ("a.gz", FileKind.OTHER), ("a.txt", FileKind.OTHER),
+])
+def test_classify_file_name(name, kind):
+    assert classify_file_name(name) is kind
+
+
+def test_scan_dir_matches_osfs_details(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.fits").write_bytes(b"x" * 2880)
+    os.utime(tmp_path / "a.fits", (1_600_000_000.123456, 1_600_000_000.123456))
+    root_fs = OSFS(str(tmp_path))
+    expected = {e.name: e for e in root_fs.scandir(".", namespaces=['details'])}
+    entries = {e.name: e for e in _scan_dir(root_fs, ".")}
+    assert entries.keys() == expected.keys()
+    assert entries["sub"].is_dir and not entries["sub"].is_file
+    assert entries["a.fits"].is_file and not entries["a.fits"].is_dir
+    assert entries["a.fits"].size == expected["a.fits"].size
+    assert entries["a.fits"].modified == expected["a.fits"].modified
+
+
+@pytest.mark.parametrize("name,is_dir,bad", [
+    ("BAD_light.fits", False, True), ("light.fits", False, False), ("light.tmp", False, True),
+    ("bad_night", True, True), ("light.tmp", True, False), ("night", True, False),
+])
+def test_marked_bad(app_context, name, is_dir, bad):
+    importer = Importer(app_context, bad_file_patterns="bad*|*.tmp", bad_dir_patterns="bad*")
+    info = Info({"basic": {"name": name, "is_dir": is_dir}})
+    assert importer.marked_bad(info) is bad
+
+
+def test_convert_xisf_to_fits_keeps_uint16(tmp_path):
+    import numpy as np
+    from astropy.io import fits
+    from xisf import XISF
+    data = (np.arange(48 * 64) * 20 % 65536).astype(np.uint16).reshape(48, 64, 1)
+    source = tmp_path / "light.xisf"
+    XISF.write(str(source), data, image_metadata={"FITSKeywords": {"OBJECT": [{"value": "M31", "comment": ""}]}})
+
+    output = tmp_path / "light.fits"
+    convert_xisf_to_fits(str(source), str(output), None, {"OBSERVER": "Alice"})
+
+    with fits.open(output) as hdul:
+        assert hdul[0].header["BITPIX"] == 16
+        assert hdul[0].header["BZERO"] == 32768
+        assert hdul[0].header["OBJECT"] == "M31"
+        assert hdul[0].header["OBSERVER"] == "Alice"
+        assert (hdul[0].data == data[..., 0]).all()
+
+
 class TestCompressFile:
 
     @pytest.mark.parametrize("ext,open_fn", [
@@ -110,6 +110,18 @@ class TestModels:
         project_file = ProjectFile.find_by_filename("does_not_match.fits", 1)
         assert project_file is None
 
+    def test_find_projectfiles_by_filenames(self):
+        paths = ["C:\\test_path\\subdir1\\file2.fits", "c:/TEST_PATH/subdir1/file3.fits", "does_not_match.fits"]
+        found = ProjectFile.find_by_filenames(paths, 1)
+        assert set(found) == set(paths[:2])
+        assert found[paths[0]].rowid
+        assert found[paths[0]].file.name == "file2.fits"
+        assert found[paths[0]].file.image.filter == "Green"
+        assert found[paths[1]].rowid is None
+        assert found[paths[1]].file.name == "file3.fits"
+        assert found[paths[1]].file.root.name == "Test Root"
+        assert found[paths[1]].project.name == "TestProject"
+
     def test_sky_distance(self):
         value = (Image.select(fn.sky_distance(Image.coord_ra, Image.coord_dec, coord1.ra.value, coord1.dec.value))
                  .where(Image.rowid == 4).scalar())
@@ -153,6 +165,15 @@ class TestModels:
         deser = SearchCriteria.from_json(json_bytes)
         assert deser == all_search_criteria
 
+    def test_criteria_clone(self):
+        criteria = SearchCriteria(paths=[RootAndPath(1, "dummy", "subdir1")], filter="Ha", coord_radius=1.0)
+        clone = criteria.clone()
+        assert clone == criteria
+        clone.paths.append(RootAndPath(1, "dummy", "subdir2"))
+        clone.coord_ra = "10.5"
+        assert len(criteria.paths) == 1
+        assert criteria.coord_ra == ""
+
     # --- helpers ---
 
     @staticmethod
@@ -185,6 +206,22 @@ class TestModels:
         criteria = SearchCriteria(width_min=4000, height_max=4000)
         assert self._search_filenames(criteria) == ["file1.fits", "file3.fits"]
 
+    # --- coordinate filter tests ---
+
+    def test_filter_by_numeric_coordinates(self):
+        criteria = SearchCriteria(coord_ra=5.4778, coord_dec=35.8239, coord_radius=0.2)
+        assert self._search_filenames(criteria) == ["file3.fits"]
+
+    def test_filter_by_string_coordinates(self):
+        criteria = SearchCriteria(coord_ra="5:28:40", coord_dec="+35:49:26", coord_radius=0.2)
+        assert self._search_filenames(criteria) == ["file3.fits"]
+
+    def test_zero_coordinates_count(self):
+        assert SearchCriteria(coord_ra=0.0, coord_dec=0.0).has_coords()
+        assert not SearchCriteria(coord_ra="", coord_dec=0.0).has_coords()
+        assert Image(coord_ra=0.0, coord_dec=0.0).get_sky_coord() is not None
+        assert Image(coord_ra=None, coord_dec=0.0).get_sky_coord() is None
+
     # --- plate scale filter tests ---
     # coord_scale = ROUND((coord_radius*2*3600)/SQRT(w²+h²), 2)
     # file1/file3: (0.5*2*3600)/sqrt(4656²+3520²) ≈ 0.62  arcsec/px
@@ -244,6 +281,34 @@ class TestModels:
         assert "file2.fits" not in names
         assert "file4.fits" not in names
 
+    @pytest.mark.parametrize("page_size", [2, 3, 10])
+    def test_search_files_total(self, page_size):
+        rows, total, has_more = search_files(SearchCriteria(), 0, page_size)
+        assert total == 4
+        assert len(rows) == min(4, page_size)
+        assert has_more == (page_size < 4)
+        rows, total, _ = search_files(SearchCriteria(project=Project.get(Project.name == "TestProject")), 0, 1)
+        assert total == 2
+
+    def test_find_nearby_orders_by_distance(self):
+        far = Project.create(name="Far")
+        near = Project.create(name="Near")
+        ProjectFile.create(project=far, file=File.get(File.name == "file4.fits"))
+        ProjectFile.create(project=near, file=File.get(File.name == "file3.fits"))
+        assert [p.name for p in Project.find_nearby(coord1)] == ["Near", "Far"]
+
+    def test_remove_already_mapped(self):
+        project = Project.get(Project.name == "TestProject")
+        files = list(File.select().order_by(File.name))
+        remaining = File.remove_already_mapped(project, files)
+        assert [f.name for f in remaining] == ["file3.fits", "file4.fits"]
+        assert remaining[0] is files[2]
+
+    def test_search_files_reuses_known_total(self):
+        _, total, has_more = search_files(SearchCriteria(), 1, 1, total=4)
+        assert total == 4
+        assert has_more
+
 
 class TestSearchCriteriaStr:
     """SearchCriteria.__str__ drives generated tab titles and filter-button labels."""
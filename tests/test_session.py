@@ -1,7 +1,9 @@
 import datetime
 
+import pytest
+
 from photonfinder.models import SearchCriteria, RootAndPath
-from photonfinder.ui.session import Session, sessions_to_json, json_to_sessions
+from photonfinder.ui.session import Session, sessions_to_json, json_to_sessions, SessionManager
 
 
 def test_roundtrip():
@@ -19,3 +21,13 @@ def test_roundtrip():
     assert len(json_str) > 0
     deser = json_to_sessions(json_str)
     assert sessions == deser
+
+
+def test_save_keeps_previous_file_when_serialization_fails(tmp_path):
+    manager = SessionManager(tmp_path / "session.json")
+    manager.save_sessions([Session(hidden_columns="", title="kept", criteria=SearchCriteria())])
+    with pytest.raises(Exception):
+        manager.save_sessions([Session(hidden_columns="", title=object(), criteria=SearchCriteria())])
+    assert [s.title for s in manager.load_sessions()] == ["kept"]
+    manager.save_sessions_in_background([Session(hidden_columns="", title="new", criteria=SearchCriteria())]).join()
+    assert [s.title for s in manager.load_sessions()] == ["new"]
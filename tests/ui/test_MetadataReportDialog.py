@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from photonfinder.models import LibraryRoot, File, Image, SearchCriteria, RootAndPath
+from photonfinder.ui.MetadataReportDialog import MetadataReportTask, _is_plain_keyword
+
+
+def test_file_to_list_of_values(database):
+    root = LibraryRoot.create(name="lib", path="/data/")
+    file = File.create(root=root, path="M31", name="light01.fits", size=1024, mtime_millis=0)
+    file.image = Image(file=file, image_type="LIGHT", exposure=300.0, filter=None)
+    task = MetadataReportTask(None, None, [])
+    plan = task._compile_plan([
+        ("File.name", "photonfinder"),
+        ("File.full_filename", "photonfinder"),
+        ("Image.exposure", "photonfinder"),
+        ("Image.filter", "photonfinder"),
+        ("size", "photonfinder"),
+        ("image_type", "photonfinder"),
+        ("OBJECT", "unknown"),
+    ])
+
+    assert task.file_to_list_of_values(file, plan) == [
+        "light01.fits", str(Path(file.full_filename())), "300.0", "", "1024", "LIGHT", ""]
+
+    del file.image
+    assert task.file_to_list_of_values(file, plan[2:4]) == ["", ""]
+
+
+def test_compile_column_plan():
+    task = MetadataReportTask(None, None, [])
+    columns, getters = task._compile_column_plan([("File.full_filename", "photonfinder"),
+                                                  ("Image.exposure", "photonfinder")])
+    # fields compare into SQL expressions with ==, so check identity
+    assert list(map(id, columns)) == list(map(id, [LibraryRoot.path, File.path, File.name, Image.exposure]))
+    row = ("/data", "M31", "light01.fits", 300.0)
+    assert [getter(row) for getter in getters] == [str(Path("/data/M31/light01.fits")), 300.0]
+
+    # anything that is not a plain column needs the model objects
+    assert task._compile_column_plan([("File.name", "photonfinder"), ("OBJECT", "fits")]) is None
+    assert task._compile_column_plan([("File.root", "photonfinder")]) is None
+    assert task._compile_column_plan([("exposure", "photonfinder")]) is None
+
+
+def test_report_is_written_when_finished(app_context, tmp_path):
+    root = LibraryRoot.create(name="report_lib", path="/data/")
+    for i in range(3):
+        File.create(root=root, path="M31", name=f"light{i}.fits", size=i, mtime_millis=0)
+    output = tmp_path / "report.csv"
+    fields = [("File.name", "photonfinder"), ("File.size", "photonfinder")]
+    for column_plan in (True, False):
+        task = MetadataReportTask(app_context, SearchCriteria(paths=[RootAndPath(root.rowid, root.name)]), [])
+        if not column_plan:
+            task._compile_column_plan = lambda field_list: None
+        task.run_in_thread = lambda fn, *args: fn(*args)
+        written = []
+        task.finished.connect(lambda: written.append(output.read_bytes()))
+        task.start(str(output), fields, 'csv')
+        assert written == [b"File.name,File.size\r\nlight0.fits,0\r\nlight1.fits,1\r\nlight2.fits,2\r\n"]
+
+
+def test_is_plain_keyword():
+    assert _is_plain_keyword("OBJECT")
+    assert _is_plain_keyword("date-obs")
+    assert not _is_plain_keyword("HIERARCH ESO DET")
+    assert not _is_plain_keyword("LONGKEYWORD")
+    assert not _is_plain_keyword("history")
+    assert not _is_plain_keyword("TEMPÉR")  # not a raw ASCII keyword, read through the astropy Header
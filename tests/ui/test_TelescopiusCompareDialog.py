@@ -1,9 +1,15 @@
 import json
 import os
 
+import astropy.units as u
 import pytest
+from astropy.coordinates import SkyCoord
 
-from photonfinder.ui.TelescopiusCompareDialog import parse_telescopius_json, TelescopiusTarget
+from photonfinder.core import hp
+from photonfinder.models import LibraryRoot, File, Image, SearchCriteria
+from photonfinder.ui import TelescopiusCompareDialog
+from photonfinder.ui.TelescopiusCompareDialog import parse_telescopius_json, TelescopiusTarget, \
+    enrich_telescopius_data
 
 
 class TestTelescopiusCompareDialog:
@@ -52,3 +58,20 @@ class TestTelescopiusCompareDialog:
         # Test with missing targets key
         result = parse_telescopius_json({"data": {"id": "test"}})
         assert result == []
+
+    @pytest.mark.parametrize("bucket_min_rows", [0, 5000])
+    def test_enrich_telescopius_data(self, database, monkeypatch, bucket_min_rows):
+        monkeypatch.setattr(TelescopiusCompareDialog, "BUCKET_MIN_ROWS", bucket_min_rows)
+        root = LibraryRoot.create(name="lib", path="C:/lib/")
+        for i, (ra, dec) in enumerate([(130.67, 14.30), (130.9, 14.30), (132.34, 19.07)]):
+            file = File.create(root=root, path="lights", name=f"img{i}.fits", size=0, mtime_millis=0)
+            pix = int(hp.skycoord_to_healpix(SkyCoord(ra, dec, unit=u.deg)))
+            Image.create(file=file, image_type="LIGHT", coord_ra=ra, coord_dec=dec, coord_pix256=pix)
+
+        targets = [TelescopiusTarget("NGC 2648", 8.71105576, 14.28499985),
+                   TelescopiusTarget("NGC 2685", 8.92636108, 58.73472214)]
+        result = enrich_telescopius_data(targets, SearchCriteria(), 0.1)
+
+        assert [r[0] for r in result] == ["NGC 2648", "NGC 2685"]
+        assert result[0][3] == "lib:lights"
+        assert result[1][3] == ""
@@ -5,5 +5,7 @@ def test_coerce_value():
     assert coerce_value("0") == 0
     assert coerce_value("0.1") == 0.1
     assert coerce_value("abc") == "abc"
+    assert coerce_value("T") is True
+    assert coerce_value("F") is False
     assert coerce_value("2024-09-01T15:30:00") == "2024-09-01T15:30:00"
 